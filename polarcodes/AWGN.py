@@ -6,13 +6,16 @@ It updates ``likelihoods`` in `PolarCode` with randomly generated log-likelihood
 for ``u`` in `PolarCode`. For puncturing, the likelihoods for the punctured bits given by
 ``source_set_lookup`` in `PolarCode` will be set to zero. For shortening,
 these likelihoods will be set to infinity. Currently only BPSK modulation is supported.
+A batch of codewords can be transmitted at once with `get_batch_likelihoods`, or with mean-shifted noise for
+importance sampling with `get_biased_batch_likelihoods`.
 """
 
 import matplotlib.pyplot as plt
 import numpy as np
+from math import erfc
 
 class AWGN:
-    def __init__(self, myPC, Eb_No, plot_noise = False):
+    def __init__(self, myPC, Eb_No, plot_noise = False, manual = False):
         """
         Parameters
         ----------
@@ -22,6 +25,8 @@ class AWGN:
             the design SNR in decibels
         plot_noise: bool
             a flag to view the modeled noise
+        manual: bool
+            suppress the transmission of ``u`` in ``myPC``, e.g. to use `get_batch_likelihoods` instead
 
         """
 
@@ -29,17 +34,130 @@ class AWGN:
         self.Es = myPC.get_normalised_SNR(Eb_No)
         self.No = 1
         self.plot_noise = plot_noise
+        if manual:
+            return
 
         tx = self.modulation(self.myPC.u)
         rx = tx + self.noise(self.myPC.N)
-        self.myPC.likelihoods = np.array(self.get_likelihoods(rx), dtype=np.float64)
+        self.myPC.likelihoods = self.puncture(np.array(self.get_likelihoods(rx), dtype=np.float64))
+
+    def puncture(self, likelihoods):
+        """
+        Change the shortened/punctured bit LLRs given by ``source_set_lookup`` in ``myPC``, in place.
+        The lookup table is broadcast over any leading batch axes.
+
+        Parameters
+        ----------
+        likelihoods: ndarray<float>
+            log-likelihood ratios, with the bit index along the last axis
+
+        Returns
+        ----------
+        ndarray<float>
+            the changed ``likelihoods``
+
+        """
 
-        # change shortened/punctured bit LLRs
         if self.myPC.punct_flag:
             if self.myPC.punct_type == 'shorten':
-                self.myPC.likelihoods[self.myPC.source_set_lookup == 0] = np.inf
+                likelihoods[..., self.myPC.source_set_lookup == 0] = np.inf
             elif self.myPC.punct_type == 'punct':
-                self.myPC.likelihoods[self.myPC.source_set_lookup == 0] = 0
+                likelihoods[..., self.myPC.source_set_lookup == 0] = 0
+        return likelihoods
+
+    def get_batch_likelihoods(self, codewords, dtype = np.float64, rng = None, out = None):
+        """
+        Transmit a batch of codewords and find their log-likelihood ratios, in one vectorised pass.
+
+        Parameters
+        ----------
+        codewords: ndarray<uint8>
+            a (B, N) array of codewords, one codeword per row
+        dtype: type
+            the floating-point type of the output, e.g. np.float32 to halve the memory
+        rng: numpy.random.Generator
+            the random number generator for the noise. The default is the global ``np.random`` generator.
+        out: ndarray<float>
+            a (B, N) array for the log-likelihood ratios, which is reused instead of allocating a new array.
+            Its type is used instead of ``dtype``.
+
+        Returns
+        ----------
+        ndarray<float>
+            a (B, N) array of log-likelihood ratios, with the shortened/punctured bits changed by `puncture`
+
+        """
+
+        rx = self.modulation(codewords) + self.noise(codewords.shape, rng)
+        if out is None:
+            return self.puncture(self.get_likelihoods(rx).astype(dtype, copy=False))
+        out[...] = self.get_likelihoods(rx)
+        return self.puncture(out)
+
+    def get_biased_batch_likelihoods(self, codewords, shift, events, defensive = 0.3, dtype = np.float64, rng = None):
+        """
+        Transmit a batch of codewords with importance sampling, and find their log-likelihood ratios. The noise of
+        each frame is drawn from a mixture: with probability ``defensive`` it is the AWGN noise, and otherwise the
+        mean of the noise is shifted on the positions of one of the error ``events``, towards the decision boundary by
+        ``shift`` times the amplitude of each symbol. The events are chosen in proportion to their pairwise error
+        probabilities Q(sqrt(2 w E_s/N_o)) for an event of weight w, i.e. to their terms of the union bound. A shift of
+        1 moves these symbols onto the boundary, halfway to the codeword that differs from the transmitted one on the
+        event.
+        The frames are weighted by the likelihood ratio of the AWGN noise to the whole mixture, so that a weighted
+        average over the frames is an unbiased estimate for the AWGN channel. The weights are at most 1/``defensive``,
+        and their spread depends on the weight of the events rather than on the block length.
+
+        Parameters
+        ----------
+        codewords: ndarray<uint8>
+            a (B, N) array of codewords, one codeword per row
+        shift: float
+            the mean shift of the noise on the event positions, as a fraction of the distance to the decision boundary
+        events: ndarray<uint8>
+            an (E, N) array with a 1 at the positions of each error event, e.g. from `PolarCode.get_error_events`
+        defensive: float
+            the probability of a frame without shifted noise, which must be greater than 0
+        dtype: type
+            the floating-point type of the output
+        rng: numpy.random.Generator
+            the random number generator for the noise. The default is the global ``np.random`` generator.
+
+        Returns
+        ----------
+        ndarray<float>, ndarray<float>
+            a (B, N) array of log-likelihood ratios, and the natural logarithm of the weight of each frame
+
+        -------------
+        **References:**
+
+        *  Smith, P. J., Shafi, M., & Gao, H. (1997). Quick simulation: a review of importance sampling techniques in communications systems. IEEE Journal on Selected Areas in Communications, 15(4), 597–613.
+
+        *  Owen, A., & Zhou, Y. (2000). Safe and Effective Importance Sampling. Journal of the American Statistical Association, 95(449), 135–143.
+
+        """
+
+        # choose a mixture component for each frame, and shift the noise of the chosen event
+        rng = np.random if rng is None else rng
+        events = np.asarray(events, dtype=np.float64)
+        event_weights = np.sum(events, axis=1)
+        probabilities = np.array([erfc(np.sqrt(w * self.Es / self.No)) for w in event_weights])
+        probabilities /= np.sum(probabilities)
+        tx = self.modulation(codewords)
+        noise = self.noise(codewords.shape, rng)
+        u = rng.random(codewords.shape[0])
+        shifted = u >= defensive
+        chosen = np.minimum(np.searchsorted(np.cumsum(probabilities), (u[shifted] - defensive) / (1 - defensive), side='right'),
+                            len(events) - 1)
+        noise[shifted] -= shift * tx[shifted] * events[chosen]
+
+        # the log-likelihood ratio of each shifted component to the AWGN noise, and the weights of the mixture
+        variance = self.No / 2
+        with np.errstate(divide='ignore'):
+            log_ratios = np.log(probabilities) + (-2 * shift * ((noise * tx) @ events.T) - shift ** 2 * self.Es * event_weights) / (2 * variance)
+        largest = np.max(log_ratios, axis=1)
+        log_event_ratio = largest + np.log(np.sum(np.exp(log_ratios - largest[:, None]), axis=1))
+        log_weights = -np.logaddexp(np.log(defensive), np.log1p(-defensive) + log_event_ratio)
+        return self.puncture(self.get_likelihoods(tx + noise).astype(dtype, copy=False)), log_weights
 
     def LLR(self, y):
         """
@@ -67,7 +185,7 @@ class AWGN:
         Parameters
         ----------
         y: ndarray<float>
-            an ensemble of received signals
+            an ensemble of received signals, of any shape
 
         Returns
         ----------
@@ -75,7 +193,7 @@ class AWGN:
             log-likelihood ratios for the input signals ``y``
 
         """
-        return [self.LLR(y[i]) for i in range(len(y))]
+        return self.LLR(y)
 
     def modulation(self, x):
         """
@@ -96,15 +214,17 @@ class AWGN:
 
         return 2 * (x - 0.5) * np.sqrt(self.Es)
 
-    def noise(self, N):
+    def noise(self, N, rng = None):
         """
         Generate gaussian noise with a specified noise power.
         For a noise power N_o, the double-side noise power is N_o/2.
 
         Parameters
         ----------
-        N: float
-            the noise power
+        N: int, tuple
+            the number of noise samples, or the shape of the noise array
+        rng: numpy.random.Generator
+            the random number generator. The default is the global ``np.random`` generator.
 
         Returns
         ----------
@@ -114,7 +234,8 @@ class AWGN:
         """
 
         # gaussian RNG vector
-        s = np.random.normal(0, np.sqrt(self.No / 2), size=N)
+        rng = np.random if rng is None else rng
+        s = rng.normal(0, np.sqrt(self.No / 2), size=N)
 
         # display RNG values with ideal gaussian pdf
         if self.plot_noise:
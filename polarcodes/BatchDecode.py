@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+"""
+A polar decoder for a batch of frames. The likelihoods are given as a (B, N) array and the messages are returned
+as a (B, K) array, so that the cost of each decoding step is shared by all B frames.
+The decoder is tied to the frozen set of a `PolarCode` when it is created, and can be reused for any number of batches.
+"""
+
+import numpy as np
+from polarcodes.utils import *
+from polarcodes.VSCD import VSCD
+from polarcodes.FastSSC import FastSSC
+from polarcodes.QuantisedSCD import QuantisedSCD
+
+class BatchDecode:
+    def __init__(self, myPC, decoder_name = 'vscd', backend = 'numpy', f_name = 'exact'):
+        """
+        Parameters
+        ----------
+        myPC: `PolarCode`
+            a polar code object created using the :class:`PolarCode` class
+        decoder_name: string
+            name of decoder to use (default is 'vscd').
+                            'vscd' => vectorised successive cancellation decoder.
+                            'scd' => the same as 'vscd', which has identical decisions to `SCD`.
+                            'vscd_<f_name>' => vectorised successive cancellation decoder with the f-function
+                                               ``f_name``, e.g. 'vscd_min_sum'.
+                            'fast_ssc' => Fast-SSC decoder with Rate-0, Rate-1, REP and SPC nodes.
+                            'quantised_scd' => fixed-point min-sum successive cancellation decoder, with the LLR
+                                               format of ``llr_quantisation`` in ``myPC``.
+                            'systematic_<name>' => any of the above for a systematic code.
+                            The 'scl' decoder of `Decode` has no batch decoder, so it raises a ValueError.
+        backend: string
+            the kernel backend of the decoder (see `backends.get_backend`), e.g. 'numba'
+        f_name: string
+            the f-function for the top branch LLRs of the 'vscd' and 'fast_ssc' decoders (see `Decode`)
+        """
+
+        self.myPC = myPC
+        self.systematic_flag = decoder_name.startswith('systematic_')
+        if self.systematic_flag:
+            decoder_name = decoder_name[len('systematic_'):]
+        if decoder_name in ('scd', 'vscd'):
+            self.decoder = VSCD(myPC, f_name, backend=backend)
+        elif decoder_name.startswith('vscd_'):
+            self.decoder = VSCD(myPC, decoder_name[len('vscd_'):], backend=backend)
+        elif decoder_name == 'fast_ssc':
+            self.decoder = FastSSC(myPC, f_name, backend=backend)
+        elif decoder_name == 'quantised_scd':
+            self.decoder = QuantisedSCD(myPC)
+        else:
+            raise ValueError("There is no batch decoder named '" + decoder_name + "'.")
+        self.info_mask = myPC.frozen_lookup == 1
+
+    def decode(self, llrs, out=None):
+        """
+        Decode a batch of frames.
+
+        Parameters
+        ----------
+        llrs: ndarray<float>
+            a (B, N) array of likelihoods at the channel output, one frame per row
+        out: ndarray<int>
+            a (B, K) array for the decoded messages, which is reused instead of allocating a new array
+
+        Returns
+        ----------
+        ndarray<int>
+            a (B, K) array of the decoded messages, excluding the CRC bits (if any)
+
+        """
+
+        x_noisy = self.decoder.decode_batch(np.atleast_2d(llrs))
+        if self.systematic_flag:
+            polar_transform(x_noisy, out=x_noisy)
+        if out is None:
+            message = x_noisy[:, self.info_mask].astype(int)
+        else:
+            message = out
+            np.compress(self.info_mask, x_noisy, axis=1, out=message)
+        if self.myPC.crc is not None:
+            message = self.myPC.crc.remove(message)
+        return message
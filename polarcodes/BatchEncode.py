@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+"""
+A polar encoder for a batch of messages. The messages are given as a (B, K) array and the codewords are returned as a
+(B, N) uint8 array, using the vectorised polar transform for every message at once.
+"""
+
+import numpy as np
+from polarcodes.utils import *
+
+class BatchEncode:
+    def __init__(self, myPC, encoder_name = 'polar_encode'):
+        """
+        Parameters
+        ----------
+        myPC: `PolarCode`
+            a polar code object created using the :class:`PolarCode` class
+        encoder_name: string
+            the name of the polar encoder.
+                            'polar_encode' => non-systematic encoding (default), identical to `Encode.polar_encode`.
+                            'systematic_encode' => systematic encoding, identical to `Encode.systematic_encode`.
+        """
+
+        self.myPC = myPC
+        self.systematic_flag = encoder_name == 'systematic_encode'
+        self.info_mask = myPC.frozen_lookup == 1
+
+    def encode(self, messages, out=None):
+        """
+        Encode a batch of messages. The CRC bits are appended to each message if a CRC is used.
+
+        Parameters
+        ----------
+        messages: ndarray<int>
+            a (B, K) array of messages, one message per row. A single message of shape (K,) is also accepted.
+        out: ndarray<uint8>
+            a C-contiguous (B, N) array for the codewords, which is reused instead of allocating a new array
+
+        Returns
+        ----------
+        ndarray<uint8>
+            a (B, N) array of codewords, or a single codeword of shape (N,) for a single message
+
+        """
+
+        if self.myPC.crc is not None:
+            messages = self.myPC.crc.encode(messages)
+        if out is None:
+            x = np.zeros(messages.shape[:-1] + (self.myPC.N,), dtype=np.uint8)
+        else:
+            x = out
+            x[...] = 0
+        x[..., self.info_mask] = messages
+        if self.systematic_flag:
+            polar_transform(x, out=x)
+            x[..., ~self.info_mask] = 0
+        return polar_transform(x, out=x)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+"""
+A cyclic redundancy check (CRC) outer code. The CRC bits are appended to the message before polar encoding, and they are
+used by the list decoder to select a candidate message. The CRC is linear, so it is computed as a parity matrix product,
+which works for a single message or a batch of messages.
+"""
+
+import numpy as np
+
+class CRC:
+    # generator polynomial coefficients, from the highest degree to the lowest degree (3GPP TS 38.212)
+    polynomials = {
+        'crc6': [1, 1, 0, 0, 0, 0, 1],
+        'crc11': [1, 1, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1],
+        'crc16': [1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1],
+        'crc24c': [1, 1, 0, 1, 1, 0, 0, 1, 0, 1, 0, 1, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 1, 1],
+    }
+
+    def __init__(self, polynomial='crc11'):
+        """
+        Parameters
+        ----------
+        polynomial: string, ndarray<int>
+            the name of a generator polynomial in ``polynomials``, or its coefficients from the highest degree
+            to the lowest degree
+
+        """
+
+        if isinstance(polynomial, str):
+            self.name = polynomial
+            polynomial = self.polynomials[polynomial]
+        else:
+            self.name = ''
+        self.g = np.array(polynomial, dtype=np.uint8)
+        self.r = len(self.g) - 1
+        self.parity_matrices = {}
+
+    def parity_matrix(self, k):
+        """
+        The (k, r) matrix P such that the CRC bits of a message m of length k are m.P (mod 2).
+        The matrices are cached for each message length.
+
+        Parameters
+        ----------
+        k: int
+            the message length
+
+        Returns
+        ----------
+        ndarray<uint8>
+            the parity matrix for messages of length ``k``
+
+        """
+
+        if k not in self.parity_matrices:
+            P = np.zeros((k, self.r), dtype=np.uint8)
+            rem = self.g[1:].copy()    # x^r mod g, for the last message bit
+            for i in range(k - 1, -1, -1):
+                P[i] = rem
+                carry = rem[0]
+                rem = np.append(rem[1:], 0)     # multiply by x
+                if carry:
+                    rem ^= self.g[1:]
+            self.parity_matrices[k] = P
+        return self.parity_matrices[k]
+
+    def get_crc(self, m):
+        """
+        Parameters
+        ----------
+        m: ndarray<int>
+            a message, or a (B, k) batch of messages
+
+        Returns
+        ----------
+        ndarray<int>
+            the CRC bits of ``m``
+
+        """
+
+        P = self.parity_matrix(m.shape[-1])
+        return np.mod(np.dot(m, P.astype(int)), 2)
+
+    def encode(self, m):
+        """
+        Append the CRC bits to a message, or to each message of a (B, k) batch.
+        """
+
+        return np.concatenate((m, self.get_crc(m).astype(np.asarray(m).dtype)), axis=-1)
+
+    def check(self, x):
+        """
+        Check the CRC of a message with the CRC bits appended, or of each message of a (B, k + r) batch.
+
+        Returns
+        ----------
+        bool, ndarray<bool>
+            True if the CRC bits match the message
+
+        """
+
+        return np.all(self.get_crc(x[..., :-self.r]) == x[..., -self.r:], axis=-1)
+
+    def remove(self, x):
+        """
+        Remove the CRC bits from a message, or from each message of a (B, k + r) batch.
+        """
+
+        return x[..., :-self.r]
@@ -3,14 +3,18 @@
 """
 Construct performs the mothercode construction.
 It uses the algorithm specified by ``construction_type`` in ``myPC``.
-Mothercode constructions supported: Bhattacharyya Bounds, Gaussian Approximation.
+Mothercode constructions supported: Bhattacharyya Bounds, Gaussian Approximation, Polarization Weight (PW) sequence.
 """
 
 import numpy as np
 from polarcodes.utils import *
+from polarcodes.backends import get_backend
 
 class Construct:
-    def __init__(self, myPC, design_SNR, manual=False):
+    # nested reliability sequences by name, for the largest block length constructed so far
+    sequences = {}
+
+    def __init__(self, myPC, design_SNR, manual=False, backend='numpy'):
         """
         Parameters
         ----------
@@ -20,23 +24,67 @@ class Construct:
             the design SNR in decibels
         manual: bool
             suppress the constructor init
+        backend: string
+            the kernel backend of the construction (see `backends.get_backend`), e.g. 'numba'
         """
 
+        self.backend = get_backend(backend)
         if manual:
             return
         else:
             self.update_mpcc(myPC, design_SNR)
 
     def update_mpcc(self, myPC, design_SNR):
+        self.construct_reliabilities(myPC, design_SNR)
+        myPC.frozen_lookup = myPC.get_lut(myPC.frozen)
+        myPC.schedule = None
+
+    def construct_reliabilities(self, myPC, design_SNR, shortened_set=()):
+        """
+        Run the construction given by ``construction_type`` in ``myPC``, and update ``reliabilities``, ``frozen``,
+        ``FERestimate`` and ``z`` in ``myPC``. If ``construction_cache`` is set in ``myPC``, the reliabilities and
+        ``z`` are loaded from the cache when possible, and stored in the cache otherwise.
+
+        Parameters
+        ----------
+        myPC: `PolarCode`
+            a polar code object created using the :class:`PolarCode` class
+        design_SNR: float
+            the design SNR in decibels
+        shortened_set: ndarray<int>
+            the coded bits that have infinite likelihoods, for a shortened construction.
+            The 'pw' construction does not depend on the channel, so it ignores ``shortened_set``.
+
+        """
+
+        # a nested sequence is only filtered, so there is nothing to cache
+        if myPC.construction_type == 'pw':
+            myPC.reliabilities, myPC.frozen, myPC.FERestimate = self.pw_pcc(myPC)
+            return
+
+        cache = myPC.construction_cache
+        if cache is not None:
+            key = cache.key(myPC, design_SNR, shortened_set)
+            entry = cache.get(key)
+            if entry is not None:
+                myPC.reliabilities, myPC.z = entry
+                myPC.frozen = np.argsort(myPC.z, kind='mergesort')[myPC.K:]     # select N-K least reliable channels
+                myPC.FERestimate = self.FER_estimate(myPC.frozen, myPC.z)
+                return
+
         # select the mothercode construction method
         design_SNR_normalised = myPC.get_normalised_SNR(design_SNR)
+        shortened_set = np.array(shortened_set, dtype=int)
         if myPC.construction_type == 'bb':
-            z0 = -design_SNR_normalised
+            z0 = np.array([-design_SNR_normalised] * myPC.N)
+            z0[shortened_set] = -np.inf
             myPC.reliabilities, myPC.frozen, myPC.FERestimate = self.general_pcc(myPC, z0)
         elif myPC.construction_type == 'ga':
             z0 = np.array([4 * design_SNR_normalised] * myPC.N)
+            z0[shortened_set] = np.inf
             myPC.reliabilities, myPC.frozen, myPC.FERestimate = self.general_ga(myPC, z0)
-        myPC.frozen_lookup = myPC.get_lut(myPC.frozen)
+        if cache is not None:
+            cache.put(key, myPC.reliabilities, myPC.z)
 
     def general_pcc(self, myPC, z0):
         """
@@ -61,37 +109,14 @@ class Construct:
 
         """
 
-        n = myPC.n
-        z = np.zeros((myPC.N, n + 1))
-        z[:, 0] = z0  # initial channel states
+        # the stages of the recursion are run by the 'bhattacharyya' kernel of the backend
+        z0 = np.array(np.broadcast_to(z0, (myPC.N,)), dtype=np.float64)
+        z = self.backend['bhattacharyya'](z0, myPC.n)
 
-        for j in range(1, n + 1):
-            u = 2 ** j  # number of branches at depth j
-            for t in range(0, myPC.N, u):  # loop over top branches at this stage
-                for s in range(int(u / 2)):
-                    k = t + s
-                    z_top = z[k, j - 1]
-                    z_bottom = z[k + int(u / 2), j - 1]
-
-                    # shortening infinity cases
-                    if z_top == -np.inf and z_bottom != -np.inf:
-                        z[k, j] = z_bottom
-                        z[k + int(u / 2), j] = -np.inf
-                    elif z_top != -np.inf and z_bottom == -np.inf:
-                        z[k, j] = z_top
-                        z[k + int(u / 2), j] = -np.inf
-                    elif z_top == -np.inf and z_bottom == -np.inf:
-                        z[k, j] = -np.inf
-                        z[k + int(u / 2), j] = -np.inf
-                    # principal equations
-                    else:
-                        z[k, j] = logdomain_diff(logdomain_sum(z_top, z_bottom), z_top + z_bottom)
-                        z[k + int(u / 2), j] = z_top + z_bottom
-
-        reliabilities = np.argsort(-z[:, n], kind='mergesort')   # ordered by least reliable to most reliable
-        frozen = np.argsort(z[:, n], kind='mergesort')[myPC.K:]     # select N-K least reliable channels
-        FERest = self.FER_estimate(frozen, z[:, n])
-        myPC.z = z[:, n]
+        reliabilities = np.argsort(-z, kind='mergesort')   # ordered by least reliable to most reliable
+        frozen = np.argsort(z, kind='mergesort')[myPC.K:]     # select N-K least reliable channels
+        FERest = self.FER_estimate(frozen, z)
+        myPC.z = z
         return reliabilities, frozen, FERest
 
     def perfect_pcc(self, myPC, p):
@@ -136,6 +161,12 @@ class Construct:
     def general_ga(self, myPC, z0):
         """
         Polar code construction using density evolution with the Gaussian Approximation. Each channel can have different parameters.
+        Each stage is vectorised over all of the channels, using the approximation of phi given by ``ga_approximation``
+        in ``myPC`` (see `utils.phi_approximations`).
+        The inverse of phi is exact up to rounding, whereas the original construction found it by bisection to within
+        0.01. The frozen sets can therefore differ from those of the original construction at the marginal indices,
+        e.g. indices 91, 222, 435 and 506 are swapped for the (512, 100) code at a design SNR of 0.5 dB, and shortened
+        codes can differ in the same way.
 
         Parameters
         ----------
@@ -157,31 +188,74 @@ class Construct:
 
         """
 
-        z = np.zeros((myPC.N, myPC.n + 1))
-        z[:, 0] = z0  # initial channel states
+        phi_approx, phi_approx_inv = phi_approximations[myPC.ga_approximation]
+        z = np.array(np.broadcast_to(z0, (myPC.N,)), dtype=np.float64)  # initial channel states
 
+        # each stage combines the top and bottom halves of blocks of 2h channels, for all blocks at once
         for j in range(1, myPC.n + 1):
-            u = 2 ** j  # number of branches at depth j
-            # loop over top branches at this stage
-            for t in range(0, myPC.N, u):
-                for s in range(int(u / 2)):
-                    k = t + s
-                    z_top = z[k, j - 1]
-                    z_bottom = z[k + int(u / 2), j - 1]
-
-                    z[k, j] = phi_inv(1 - (1 - phi(z_top)) * (1 - phi(z_bottom)))
-                    z[k + int(u / 2), j] = z_top + z_bottom
-
-        m = np.array([logQ_Borjesson(0.707*np.sqrt(z[i, myPC.n])) for i in range(myPC.N)])
+            h = 2 ** (j - 1)
+            blocks = z.reshape(-1, 2, h)
+            z_top = blocks[:, 0, :].copy()
+            z_bottom = blocks[:, 1, :]
+            blocks[:, 0, :] = phi_approx_inv(1 - (1 - phi_approx(z_top)) * (1 - phi_approx(z_bottom)))
+            blocks[:, 1, :] = z_top + z_bottom
+
+        m = logQ_Borjesson(0.707 * np.sqrt(z))
         reliabilities = np.argsort(-m, kind='mergesort')    # ordered by least reliable to most reliable
         frozen = np.argsort(m, kind='mergesort')[myPC.K:]     # select N-K least reliable channels
         FERest = self.FER_estimate(frozen, m)
         myPC.z = m
         return reliabilities, frozen, FERest
 
+    def pw_pcc(self, myPC):
+        """
+        Polar code construction using the Polarization Weight (PW) sequence from `pw_sequence`.
+        The sequence is computed once for the largest block length so far, and the construction for any (N, K)
+        is found from it by `sequence_pcc` without computing it again.
+
+        Returns
+        ----------
+        ndarray<int>, ndarray<int>, float
+            channel reliabilities (least reliable first), the frozen indices, and NaN for the FER estimate
+
+        """
+
+        sequence = Construct.sequences.get('pw')
+        if sequence is None or len(sequence) < myPC.N:
+            sequence = pw_sequence(myPC.n)
+            Construct.sequences['pw'] = sequence
+        return self.sequence_pcc(myPC, sequence)
+
+    def sequence_pcc(self, myPC, sequence):
+        """
+        Polar code construction from a nested reliability sequence, such as `pw_sequence` or the sequence of
+        3GPP TS 38.212 Table 5.3.1.2-1. The sequence does not give the bit-channel error probabilities,
+        so ``z`` in ``myPC`` is set to NaN.
+
+        Parameters
+        ----------
+        sequence: ndarray<int>
+            the indices of a block length N_max >= N, from the least reliable to the most reliable. The indices use the
+            convention of 3GPP TS 38.212, which is the bit-reversal of the indices of ``myPC``.
+
+        Returns
+        ----------
+        ndarray<int>, ndarray<int>, float
+            channel reliabilities (least reliable first), the frozen indices, and NaN for the FER estimate
+
+        """
+
+        nested = sequence[sequence < myPC.N]
+        reliabilities = bit_reversed(nested.astype(int), myPC.n)
+        frozen = reliabilities[:myPC.N - myPC.K]    # select N-K least reliable channels
+        myPC.z = np.full(myPC.N, np.nan)
+        return reliabilities, frozen, np.nan
+
     def FER_estimate(self, frozen, z):
+        # the probability that any information bit-channel is in error, accumulated in index order
+        info_mask = np.ones(len(z), dtype=bool)
+        info_mask[frozen] = False
         FERest = 0
-        for i in range(len(z)):
-            if i not in frozen:
-                FERest = FERest + np.exp(z[i]) - np.exp(z[i]) * FERest
+        for p in np.exp(z[info_mask]).tolist():
+            FERest = FERest + p - p * FERest
         return FERest
\ No newline at end of file
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+"""
+A cache of mothercode constructions. A construction is deterministic, so `Construct` and `Shorten` store its results
+and load them the next time the same construction is needed, instead of computing it again.
+The cache is used when it is set as ``construction_cache`` in a `PolarCode`.
+
+Only the reliabilities and the bit-channel parameters ``z`` are stored, since they depend on K only through the
+design SNR normalised by the code rate. The frozen set and the FER estimate are found from them for each K, so repeated
+constructions, and sweeps over K at the same normalised design SNR, only pay for the construction once. The entries are kept in memory with least-recently-used (LRU) eviction, and they can also be
+saved in a directory as ``.npz`` files, with the reliabilities stored as the smallest unsigned integer type.
+"""
+
+import numpy as np
+import hashlib
+import os
+from collections import OrderedDict
+
+class ConstructionCache:
+    def __init__(self, max_entries=64, cache_dir=None, max_files=1024, snr_resolution=1e-3):
+        """
+        Parameters
+        ----------
+        max_entries: int
+            the maximum number of constructions kept in memory
+        cache_dir: string
+            a directory for the persistent cache, or None to keep the cache in memory only
+        max_files: int
+            the maximum number of constructions kept in ``cache_dir``
+        snr_resolution: float
+            the normalised design SNRs are quantised to this step (in decibels) for the cache keys
+
+        """
+
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self.snr_resolution = snr_resolution
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, myPC, design_SNR, shortened_set):
+        """
+        The cache key of a construction, which identifies everything that the reliabilities depend on.
+
+        Parameters
+        ----------
+        myPC: `PolarCode`
+            a polar code object created using the :class:`PolarCode` class
+        design_SNR: float
+            the design SNR in decibels. It is normalised by `PolarCode.get_normalised_SNR` and quantised to
+            ``snr_resolution`` decibels.
+        shortened_set: ndarray<int>
+            the coded bits with infinite likelihoods in the construction, which is empty for the mothercode
+
+        Returns
+        ----------
+        string
+            a hexadecimal key, which is also the name of the file in ``cache_dir``
+
+        """
+
+        normalised_SNR_dB = 10 * np.log10(myPC.get_normalised_SNR(design_SNR))
+        params = [myPC.construction_type, myPC.N, int(np.round(normalised_SNR_dB / self.snr_resolution)),
+                  sorted(int(i) for i in shortened_set)]
+        if myPC.construction_type == 'ga':
+            params.append(myPC.ga_approximation)
+        return hashlib.sha1(repr(params).encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Load a construction from memory, or else from ``cache_dir``.
+
+        Returns
+        ----------
+        ndarray<int>, ndarray<float>
+            the reliabilities and ``z`` of the construction, or None if it is not in the cache
+
+        """
+
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return tuple(a.copy() for a in self.entries[key])
+
+        filename = self.filename(key)
+        if filename is not None and os.path.isfile(filename):
+            with np.load(filename) as data:
+                entry = (data['reliabilities'].astype(int), data['z'])
+            os.utime(filename)  # the modification time orders the files for eviction
+            self.add(key, entry)
+            self.hits += 1
+            return tuple(a.copy() for a in entry)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, reliabilities, z):
+        """
+        Store a construction in memory, and in ``cache_dir`` if it is set.
+        """
+
+        entry = (np.array(reliabilities, dtype=int), np.array(z, dtype=np.float64))
+        self.add(key, entry)
+
+        filename = self.filename(key)
+        if filename is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            index_type = np.min_scalar_type(max(len(z) - 1, 0))
+            tmp_filename = filename + '.' + str(os.getpid()) + '.tmp.npz'
+            np.savez(tmp_filename, reliabilities=entry[0].astype(index_type), z=entry[1])
+            os.replace(tmp_filename, filename)  # atomic, so other processes never see a partial file
+            self.evict_files()
+
+    def add(self, key, entry):
+        # add an entry to the memory cache, and evict the least recently used entries
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def filename(self, key):
+        if self.cache_dir is None:
+            return None
+        return os.path.join(self.cache_dir, key + '.npz')
+
+    def evict_files(self):
+        # remove the least recently used files from cache_dir
+        filenames = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith('.npz')
+                     and not f.endswith('.tmp.npz')]
+        if len(filenames) > self.max_files:
+            filenames.sort(key=os.path.getmtime)
+            for filename in filenames[:len(filenames) - self.max_files]:
+                os.remove(filename)
+
+    def clear(self):
+        """
+        Remove every construction from memory and from ``cache_dir``.
+        """
+
+        self.entries.clear()
+        if self.cache_dir is not None and os.path.isdir(self.cache_dir):
+            for f in os.listdir(self.cache_dir):
+                if f.endswith('.npz'):
+                    os.remove(os.path.join(self.cache_dir, f))
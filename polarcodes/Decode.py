@@ -1,36 +1,106 @@
 #!/usr/bin/env python
 
 """
-A polar decoder class. Currently only Successive Cancellation Decoder (SCD) is supported.
+A polar decoder class. Supported decoders: Successive Cancellation Decoder (SCD), a vectorised SCD (VSCD),
+Fast Simplified Successive Cancellation (Fast-SSC) decoder, Successive Cancellation List (SCL) decoder, and a
+fixed-point SCD with quantised LLRs.
+Each decoder can be used with systematic codes by prefixing its name with 'systematic_'.
 """
 
 import numpy as np
 from polarcodes.utils import *
-from polarcodes.SCD import SCD
+from polarcodes.VSCD import VSCD
+from polarcodes.FastSSC import FastSSC
+from polarcodes.SCL import SCL
+from polarcodes.QuantisedSCD import QuantisedSCD
+from polarcodes.backends import get_backend
 
 class Decode:
-    def __init__(self, myPC, decoder_name = 'scd'):
+    def __init__(self, myPC, decoder_name = 'scd', list_size = 4, backend = 'numpy', f_name = 'exact'):
         """
         Parameters
         ----------
         myPC: `PolarCode`
             a polar code object created using the :class:`PolarCode` class
         decoder_name: string
-            name of decoder to use (default is 'scd')
+            name of decoder to use (default is 'scd').
+                            'scd' => successive cancellation decoder.
+                            'vscd' => vectorised successive cancellation decoder, identical decisions to 'scd'.
+                            'vscd_<f_name>' => vectorised successive cancellation decoder with the f-function
+                                               ``f_name``, e.g. 'vscd_min_sum'.
+                            'fast_ssc' => Fast-SSC decoder with Rate-0, Rate-1, REP and SPC nodes.
+                            'scl' => successive cancellation list decoder, using the CRC in ``myPC`` (if any)
+                                     to select the decoded message.
+                            'quantised_scd' => fixed-point min-sum successive cancellation decoder, with the LLR
+                                               format of ``llr_quantisation`` in ``myPC``.
+                            'systematic_<name>' => any of the above for a systematic code.
+        list_size: int
+            the list size of the 'scl' decoder (default is 4)
+        backend: string
+            the kernel backend of the decoder (see `backends.get_backend`), e.g. 'numba'.
+            With a backend that has a compiled tree walk, 'scd' uses it through `VSCD`, with identical decisions.
+        f_name: string
+            the f-function for the top branch LLRs of the 'scd', 'vscd', 'fast_ssc' and 'scl' decoders.
+            Options: {'exact', 'min_sum', 'offset_min_sum', 'normalised_min_sum'} (see `decoder_utils.f_functions`).
+            The approximations of the exact f-function are cheaper, with a small loss in FER.
+            Any f-function other than 'exact' makes 'scd' use `VSCD`.
         """
 
         self.myPC = myPC
         self.x_noisy = np.array([])
 
         # select decoding algorithm
-        if decoder_name == 'scd':
-            scd = SCD(myPC)
-            self.x_noisy = scd.decode()
-            self.myPC.message_received = self.noisy_message(self.x_noisy, False)
-        elif decoder_name == 'systematic_scd':
-            scd = SCD(myPC)
+        systematic_flag = decoder_name.startswith('systematic_')
+        if systematic_flag:
+            decoder_name = decoder_name[len('systematic_'):]
+        if decoder_name == 'scd' and f_name == 'exact' and get_backend(backend)['sc_decode'] is None:
+            scd = myPC.get_scd()
             self.x_noisy = scd.decode()
-            self.myPC.message_received = self.noisy_message(self.x_noisy, True)
+        elif decoder_name in ('scd', 'vscd'):
+            vscd = VSCD(myPC, f_name, backend=backend)
+            self.x_noisy = vscd.decode()
+        elif decoder_name.startswith('vscd_'):
+            vscd = VSCD(myPC, decoder_name[len('vscd_'):], backend=backend)
+            self.x_noisy = vscd.decode()
+        elif decoder_name == 'fast_ssc':
+            fast_ssc = FastSSC(myPC, f_name, backend=backend)
+            self.x_noisy = fast_ssc.decode()
+        elif decoder_name == 'scl':
+            scl = SCL(myPC, list_size, f_name, backend=backend)
+            candidates, metrics = scl.decode()
+            self.x_noisy = self.crc_select(candidates, systematic_flag)
+        elif decoder_name == 'quantised_scd':
+            quantised_scd = QuantisedSCD(myPC)
+            self.x_noisy = quantised_scd.decode()
+        message = self.noisy_message(self.x_noisy, systematic_flag)
+        if self.myPC.crc is not None:
+            message = self.myPC.crc.remove(message)
+        self.myPC.message_received = message
+
+    def crc_select(self, candidates, systematic_flag):
+        """
+        Select the most likely candidate from a list decoder whose message passes the CRC.
+        If no candidate passes the CRC, or no CRC is used, the most likely candidate is selected.
+
+        Parameters
+        ----------
+        candidates: ndarray<int>
+            the decoded bits of each candidate as rows, from the most likely to the least likely
+        systematic_flag: bool
+            whether or not the code is systematic
+
+        Returns
+        ----------
+        ndarray<int>
+            the selected candidate
+
+        """
+
+        if self.myPC.crc is not None:
+            for x_noisy in candidates:
+                if self.myPC.crc.check(self.noisy_message(x_noisy, systematic_flag)):
+                    return x_noisy
+        return candidates[0]
 
     def noisy_message(self, x_noisy, systematic_flag):
         if systematic_flag:
@@ -38,5 +108,5 @@ class Decode:
         return x_noisy[self.myPC.frozen_lookup == 1]
 
     def systematic_decode(self, x_noisy):
-        x = np.array([x_noisy], dtype=int)
-        return np.transpose(np.mod(np.dot(self.myPC.T, x.T), 2))[0]
+        # the message bits of a systematic code are the information bits of the polar transform of the decoded bits
+        return polar_transform(x_noisy)
@@ -18,6 +18,8 @@ class Encode:
             the name of the polar encoder implementation.
                             'polar_encode' => a non_recursive implementation (default).
                             'polar_encode_recursive' => a recursive implementation.
+                            'polar_encode_vectorised' => an O(N log N) vectorised implementation using `polar_transform`.
+                            'systematic_encode' => a systematic implementation.
         """
 
         self.myPC = myPC
@@ -25,9 +27,9 @@ class Encode:
             self.polar_encode()
         elif encoder_name == 'polar_encode_recursive':
             self.polar_encode2(0, myPC.N-1)
+        elif encoder_name == 'polar_encode_vectorised':
+            self.polar_encode_vectorised()
         elif encoder_name == 'systematic_encode':
-            if myPC.T == None:
-                self.systematic_init()
             self.systematic_encode()
 
     def polar_encode2(self, i1, i2):
@@ -78,28 +80,23 @@ class Encode:
                     self.myPC.u[l] = self.myPC.u[l] ^ self.myPC.u[l + n_split]
             n = n_split
 
-    def systematic_encode(self):
+    def polar_encode_vectorised(self):
         """
-        Encodes a message using systematic polar encode by matrix multiplications.
-        The input message is transformed using matrix T such that the subsequent polar transformation
-        will result in the message bits being in the codeword, i.e. a systematic polar code.
+        Encodes a message using polar coding with log2(N) vectorised stages of XORs on uint8 bits.
+        The output ``u`` in ``myPC`` is identical to `polar_encode`.
         """
 
-        # systematic polar encoding operations
-        x = np.array([self.myPC.x])
-        v = np.mod(np.dot(self.myPC.T, x.T), 2)
-        self.myPC.u = np.transpose(np.mod(np.dot(self.myPC.F, v), 2))[0]
+        self.myPC.u = polar_transform(self.myPC.u.astype(np.uint8))
 
-    def systematic_init(self):
+    def systematic_encode(self):
         """
-        Calculate the systematic T transformation required in ``Encode.systematic_encode``,
-        then store it in ``self.myPC`` for quick access by the systematic encoding function.
+        Encodes a message using systematic polar encoding with two polar transforms.
+        The input message is transformed, and its frozen bits are set to zero, such that the subsequent
+        polar transformation will result in the message bits being in the codeword, i.e. a systematic polar code.
+        No N x N matrix is built, so the complexity is O(N log N).
         """
 
-        # T = [I_(N-K,N)|F_(K,N)]
-        # multiply with the inverse of sub-matrix F_A for indices in A,
-        # leaving the other bits of u unchanged (rows in A.T set to identity)
-        T = np.eye(self.myPC.N, dtype=int)
-        A = inverse_set(self.myPC.frozen, self.myPC.N)
-        T[A, :] = self.myPC.F[A, :]
-        self.myPC.T = T
+        # systematic polar encoding operations
+        v = polar_transform(self.myPC.x.astype(np.uint8))
+        v[self.myPC.frozen_lookup == 0] = 0
+        self.myPC.u = polar_transform(v)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+"""
+A Fast Simplified Successive Cancellation (Fast-SSC) decoder. It uses the same tree as `VSCD`, but the subtrees that
+are Rate-0 (all frozen), Rate-1 (no frozen bits), repetition (REP, only the last bit is not frozen) and
+single-parity-check (SPC, only the first bit is frozen) are decoded in closed form at their root,
+without visiting their leaves. The node types are found once from the frozen set by `Schedule`,
+and the decoder runs a flat list of instructions.
+"""
+
+import numpy as np
+from polarcodes.utils import *
+from polarcodes.decoder_utils import *
+from polarcodes.backends import get_backend
+
+class FastSSC:
+    def __init__(self, myPC, f_name='exact', special_nodes=('rate0', 'rate1', 'rep', 'spc'), backend='numpy'):
+        """
+        Parameters
+        ----------
+        myPC: `PolarCode`
+            a polar code object created using the :class:`PolarCode` class
+        f_name: string
+            the f-function used for the top branch LLRs. Options: {'exact', 'min_sum', 'offset_min_sum',
+            'normalised_min_sum'} (see `decoder_utils.f_functions`).
+        special_nodes: tuple
+            the node types that are decoded in closed form. Rate-0, Rate-1 and REP nodes give the same decisions
+            as `SCD`, while SPC nodes use a maximum-likelihood decoder, which can differ from `SCD`.
+        backend: string
+            the kernel backend of the f/g functions (see `backends.get_backend`)
+
+        """
+
+        self.myPC = myPC
+        kernels = get_backend(backend)
+        self.upper_llrs = kernels['f_functions'][f_name][0]
+        self.lower_llrs = kernels['lower_llrs']
+        self.special_nodes = special_nodes
+        schedule = self.myPC.get_schedule()
+        self.order = schedule.order
+        self.instructions = schedule.get_instructions(tuple(special_nodes))
+        self.L = []
+        self.B = []
+
+    def allocate(self, batch_shape):
+        """
+        Allocate one LLR buffer per depth, and one buffer per depth for the bits of the two branches of a node.
+        The buffers are kept between calls with the same batch shape.
+        """
+
+        if len(self.L) > 0 and self.L[0].shape[:-1] == batch_shape:
+            return
+        N = self.myPC.N
+        n = self.myPC.n
+        self.L = [np.empty(batch_shape + (N >> d,), dtype=np.float64) for d in range(n + 1)]
+        self.B = [np.zeros(batch_shape + (2 * (N >> d),), dtype=np.uint8) for d in range(n + 1)]
+
+    def decode(self):
+        """
+        Fast-SSC decoder. The decoder will use the frozen set as defined by ``frozen`` in ``myPC``, and the likelihoods
+        as defined by ``likelihoods`` in ``myPC``.
+
+        Returns
+        ----------
+        ndarray<int>
+            the decoded bits, in the same order as the output of `SCD.decode`
+
+        -------------
+        **References:**
+
+        *  Alamdar-Yazdi, A., & Kschischang, F. R. (2011). A Simplified Successive-Cancellation Decoder for Polar Codes. IEEE Communications Letters, 15(12), 1378–1380.
+
+        *  Sarkis, G., Giard, P., Vardy, A., Thibeault, C., & Gross, W. J. (2014). Fast Polar Decoders: Algorithm and Implementation. IEEE Journal on Selected Areas in Communications, 32(5), 946–957.
+
+        """
+
+        return self.decode_batch(self.myPC.likelihoods).astype(int)
+
+    def decode_batch(self, llrs):
+        """
+        Decode a batch of frames at once.
+
+        Parameters
+        ----------
+        llrs: ndarray<float>
+            a (B, N) array of channel likelihoods, one frame per row. A single frame of shape (N,) is also accepted.
+
+        Returns
+        ----------
+        ndarray<uint8>
+            a (B, N) array of the decoded bits, in the same order as the output of `SCD.decode`
+
+        """
+
+        N = self.myPC.N
+        n = self.myPC.n
+        self.allocate(llrs.shape[:-1])
+        L = self.L
+        B = self.B
+        u_hat = np.zeros(llrs.shape, dtype=np.uint8)
+        L[0][:] = llrs[..., self.order]
+
+        for op, d, j in self.instructions:
+            h = N >> d
+            if op == 'f':
+                L[d][:] = self.upper_llrs(L[d - 1][..., :h], L[d - 1][..., h:])
+                continue
+            elif op == 'g':
+                L[d][:] = self.lower_llrs(L[d - 1][..., h:], L[d - 1][..., :h], B[d][..., :h])
+                continue
+            elif op == 'combine':
+                bits = B[d + 1]
+                bits[..., :h // 2] ^= bits[..., h // 2:]
+            else:
+                bits = self.decode_node(op, L[d])
+                if op != 'rate0':
+                    u_hat[..., j * h:(j + 1) * h] = polar_transform(bits)
+
+            # the bits of a completed node are written to its half of the parent node
+            side = j & 1
+            B[d][..., side * h:(side + 1) * h] = bits
+        return u_hat[..., self.order]
+
+    def decode_node(self, node_type, llrs):
+        """
+        Decode the bits of a special node in closed form.
+
+        Parameters
+        ----------
+        node_type: string
+            one of 'rate0', 'rate1', 'rep' or 'spc'
+        llrs: ndarray<float>
+            the LLRs at the root of the node
+
+        Returns
+        ----------
+        ndarray<uint8>
+            the bits at the root of the node
+
+        """
+
+        if node_type == 'rate0':
+            return np.zeros(llrs.shape, dtype=np.uint8)
+        elif node_type == 'rate1':
+            return hard_decisions(llrs)
+        elif node_type == 'rep':
+            # the sum of the LLRs, where an infinite LLR from shortening forces the bit to zero as in `lower_llr`
+            with np.errstate(invalid='ignore'):
+                total = np.sum(llrs, axis=-1, keepdims=True)
+            total = np.where(np.any(llrs == np.inf, axis=-1, keepdims=True), np.inf, total)
+            return np.broadcast_to(hard_decisions(total), llrs.shape)
+        else:
+            # flip the least reliable bit if the parity check fails (Wagner decoding)
+            bits = hard_decisions(llrs)
+            parity = np.bitwise_xor.reduce(bits, axis=-1, keepdims=True)
+            weakest = np.argmin(np.abs(llrs), axis=-1)[..., np.newaxis]
+            np.put_along_axis(bits, weakest, np.take_along_axis(bits, weakest, axis=-1) ^ parity, axis=-1)
+            return bits
@@ -3,15 +3,26 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import numpy as np
 from polarcodes.PolarCode import PolarCode
+from polarcodes.ConstructionCache import ConstructionCache
 
 class GUI:
-    def __init__(self):
+    def __init__(self, cache_dir=None):
+        """
+        Parameters
+        ----------
+        cache_dir: string
+            a directory to keep the constructions in between sessions (see `ConstructionCache`), or None to only
+            cache them in memory
+
+        """
+
         # initialise GUI global vars
         self.master = self.create_window()
         self.my_widget_ptrs = []
         self.fig = Figure(figsize=(10, 5), dpi=60)
         self.new_plot = self.fig.add_subplot(111)
         self.myPC = PolarCode(100, 64)
+        self.myPC.construction_cache = ConstructionCache(cache_dir=cache_dir)
 
         # generate section frames
         first_frame = self.make_inputs()
@@ -85,7 +96,7 @@ class GUI:
         Eb_No_values_entry.insert(END, '1,2,3,4')
 
         # menus
-        const_options = ['bb', 'ga']
+        const_options = ['bb', 'ga', 'pw']
         const_opt_val = StringVar(my_frame)
         const_opt_val.set(const_options[0])
         const_opt = OptionMenu(my_frame, const_opt_val, *const_options)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+
+"""
+A Monte-Carlo simulation of a polar code that splits the frames of each E_b/N_o over a pool of processes.
+The frames are simulated in chunks, and chunk k of an E_b/N_o point always uses the k-th random generator spawned from
+a ``SeedSequence``. The chunks are counted in order by `accumulate_errors`, so the early stopping rules are applied to
+the global counts, and the results depend on the seed but not on the number of processes or their timing.
+"""
+
+import numpy as np
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from polarcodes.utils import *
+from polarcodes.BatchEncode import BatchEncode
+from polarcodes.BatchDecode import BatchDecode
+from polarcodes.AWGN import AWGN
+
+# the polar code, encoder and decoder of a worker process, set once by `init_worker`
+worker_state = {}
+
+def init_worker(myPC, decoder_name, reference_decoder):
+    worker_state['myPC'] = myPC
+    worker_state['encoder'] = BatchEncode(myPC)
+    worker_state['decoder'] = BatchDecode(myPC, decoder_name)
+    worker_state['reference'] = None if reference_decoder is None else BatchDecode(myPC, reference_decoder)
+
+def simulate_frames(Eb_No, num_frames, seed):
+    """
+    Simulate a chunk of random frames in a worker process.
+
+    Parameters
+    ----------
+    Eb_No: float
+        E_b/N_o in decibels
+    num_frames: int
+        the number of frames in the chunk
+    seed: `numpy.random.SeedSequence`
+        the seed of the random generator for the chunk
+
+    Returns
+    ----------
+    ndarray<int>, ndarray<int>
+        the number of bit errors in each frame, and of the reference decoder (or None)
+
+    """
+
+    myPC = worker_state['myPC']
+    rng = np.random.default_rng(seed)
+    messages = rng.integers(2, size=(num_frames, myPC.get_message_length()))
+    channel = AWGN(myPC, Eb_No, manual=True)
+    llrs = channel.get_batch_likelihoods(worker_state['encoder'].encode(messages), rng=rng)
+    num_errors = np.sum(messages ^ worker_state['decoder'].decode(llrs), axis=1)
+    if worker_state['reference'] is None:
+        return num_errors, None
+    return num_errors, np.sum(messages ^ worker_state['reference'].decode(llrs), axis=1)
+
+class ParallelSimulate:
+    def __init__(self, myPC, num_workers=None, chunk_size=256, sim_seed=1729, decoder_name='vscd', reference_decoder=None):
+        """
+        Parameters
+        ----------
+        myPC: `PolarCode`
+            a polar code object created using the :class:`PolarCode` class, which is copied to each worker process
+        num_workers: int
+            the number of worker processes (default is the number of CPUs)
+        chunk_size: int
+            the number of frames simulated by a worker at once, using `BatchDecode`. Up to two chunks per worker are
+            in flight, and the chunks that are already running when the early stopping condition is met cannot be
+            cancelled, so each E_b/N_o point waits for up to ``num_workers`` chunks that are not counted.
+        sim_seed: int
+            the seed of the ``SeedSequence`` for all of the random generators
+        decoder_name: string
+            the name of the `BatchDecode` decoder
+        reference_decoder: string
+            the name of a `BatchDecode` decoder that also decodes every frame, or None
+
+        """
+
+        self.myPC = myPC
+        self.num_workers = os.cpu_count() if num_workers is None else num_workers
+        self.chunk_size = chunk_size
+        self.seed_sequence = np.random.SeedSequence(sim_seed)
+        self.reference_decoder = reference_decoder
+        self.pool = ProcessPoolExecutor(self.num_workers, initializer=init_worker,
+                                        initargs=(myPC, decoder_name, reference_decoder))
+
+    def run_simulation(self, Eb_No, max_iter, min_errors, min_iters):
+        """
+        The same Monte-Carlo simulation as `PolarCode.run_simulation`, over the worker processes.
+        Each call spawns a new random generator for its E_b/N_o point.
+
+        Parameters
+        ----------
+        Eb_No: float
+            E_b/N_o in decibels
+        max_iter: int
+            maximum number of frames
+        min_errors: int
+            the minimum number of frame errors before early stopping is allowed
+        min_iters: int
+            the minimum number of frames before early stopping is allowed
+
+        Returns
+        ----------
+        int, int, int
+            the number of frame errors, the number of bit errors, and the number of frames simulated.
+            If ``reference_decoder`` is given, these counts are followed by the counts of the reference decoder.
+
+        """
+
+        snr_seed = self.seed_sequence.spawn(1)[0]
+        chunks = deque()
+        num_submitted = 0
+        counts = (0, 0, 0)
+        reference_counts = (0, 0, 0)
+        while num_submitted < max_iter or len(chunks) > 0:
+            # keep two chunks per worker in flight
+            while num_submitted < max_iter and len(chunks) < 2 * self.num_workers:
+                num_frames = min(self.chunk_size, max_iter - num_submitted)
+                chunks.append(self.pool.submit(simulate_frames, Eb_No, num_frames, snr_seed.spawn(1)[0]))
+                num_submitted += num_frames
+
+            # count the oldest chunk, with the early stopping condition checked for each frame
+            num_errors, reference_errors = chunks.popleft().result()
+            num_frames = counts[2]
+            counts, stop = accumulate_errors(num_errors, counts, min_errors, min_iters)
+            if reference_errors is not None:  # count the reference errors over the same frames
+                reference_counts, _ = accumulate_errors(reference_errors[:counts[2] - num_frames], reference_counts,
+                                                        np.inf, np.inf)
+            if stop:
+                for chunk in chunks:
+                    chunk.cancel()  # only the chunks that have not started are cancelled, the running chunks finish
+                break
+        if self.reference_decoder is not None:
+            return counts + reference_counts
+        return counts
+
+    def close(self):
+        """
+        Shut down the worker processes. The chunks that have not started are cancelled, e.g. after an exception.
+        """
+
+        self.pool.shutdown(cancel_futures=True)
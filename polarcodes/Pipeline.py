@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+
+"""
+A streaming encode-channel-decode pipeline for a polar code. Each stage is a generator that takes the batches of the
+stage before it and yields its own batches, so the stages can be chained, or used on their own with any iterable
+of batches:
+
+    message source -> encoder -> AWGN channel -> decoder -> error counter
+
+Every stage writes its output into a buffer that is allocated once for ``batch_size`` frames, and yields a view of
+that buffer. A simulation of any length therefore uses a constant amount of memory, and the per-frame state of
+`PolarCode` (``x``, ``u``, ``likelihoods``, ``message`` and ``message_received``) is not used. A yielded batch is
+overwritten by the next batch of the same stage, so it must be copied if it is needed for longer.
+"""
+
+import numpy as np
+from itertools import tee
+from polarcodes.utils import *
+from polarcodes.BatchEncode import BatchEncode
+from polarcodes.BatchDecode import BatchDecode
+from polarcodes.AWGN import AWGN
+
+class Pipeline:
+    def __init__(self, myPC, batch_size=256, encoder_name='polar_encode', decoder_name='vscd', llr_dtype=np.float64,
+                 backend='numpy'):
+        """
+        Parameters
+        ----------
+        myPC: `PolarCode`
+            a polar code object created using the :class:`PolarCode` class
+        batch_size: int
+            the maximum number of frames in a batch
+        encoder_name: string
+            the name of the `BatchEncode` encoder
+        decoder_name: string
+            the name of the `BatchDecode` decoder
+        llr_dtype: type
+            the floating-point type of the likelihoods, e.g. np.float32 to halve the memory
+        backend: string
+            the kernel backend of the decoder (see `backends.get_backend`)
+
+        """
+
+        self.myPC = myPC
+        self.batch_size = batch_size
+        self.encoder = BatchEncode(myPC, encoder_name)
+        self.decoder = BatchDecode(myPC, decoder_name, backend)
+
+        # the buffers of the stages, which are reused for every batch
+        message_length = myPC.get_message_length()
+        self.messages = np.zeros((batch_size, message_length), dtype=np.uint8)
+        self.codewords = np.zeros((batch_size, myPC.N), dtype=np.uint8)
+        self.llrs = np.zeros((batch_size, myPC.N), dtype=llr_dtype)
+        self.messages_received = np.zeros((batch_size, myPC.K), dtype=np.uint8)
+        self.errors = np.zeros((batch_size, message_length), dtype=bool)
+
+    def source(self, num_frames, rng):
+        """
+        Message source stage.
+
+        Parameters
+        ----------
+        num_frames: int
+            the total number of messages
+        rng: numpy.random.Generator
+            the random number generator for the messages
+
+        Yields
+        ----------
+        ndarray<uint8>
+            a (B, K) batch of random messages, excluding the CRC bits (if any), with B <= ``batch_size``
+
+        """
+
+        num_sent = 0
+        while num_sent < num_frames:
+            B = min(self.batch_size, num_frames - num_sent)
+            messages = self.messages[:B]
+            messages[...] = rng.integers(2, size=messages.shape)
+            num_sent += B
+            yield messages
+
+    def encode(self, batches):
+        """
+        Encoder stage.
+
+        Parameters
+        ----------
+        batches: iterable
+            (B, K) batches of messages
+
+        Yields
+        ----------
+        ndarray<uint8>
+            the (B, N) batch of codewords of each batch of messages
+
+        """
+
+        for messages in batches:
+            yield self.encoder.encode(messages, out=self.codewords[:len(messages)])
+
+    def transmit(self, batches, Eb_No, rng):
+        """
+        AWGN channel stage, using `AWGN.get_batch_likelihoods`.
+
+        Parameters
+        ----------
+        batches: iterable
+            (B, N) batches of codewords
+        Eb_No: float
+            E_b/N_o in decibels
+        rng: numpy.random.Generator
+            the random number generator for the noise
+
+        Yields
+        ----------
+        ndarray<float>
+            the (B, N) batch of likelihoods of each batch of codewords
+
+        """
+
+        channel = AWGN(self.myPC, Eb_No, manual=True)
+        for codewords in batches:
+            yield channel.get_batch_likelihoods(codewords, rng=rng, out=self.llrs[:len(codewords)])
+
+    def decode(self, batches):
+        """
+        Decoder stage.
+
+        Parameters
+        ----------
+        batches: iterable
+            (B, N) batches of likelihoods
+
+        Yields
+        ----------
+        ndarray<uint8>
+            the (B, K) batch of decoded messages of each batch of likelihoods, excluding the CRC bits (if any)
+
+        """
+
+        for llrs in batches:
+            yield self.decoder.decode(llrs, out=self.messages_received[:len(llrs)])
+
+    def count_errors(self, messages, messages_received, min_errors=np.inf, min_iters=0):
+        """
+        Error counter stage. The errors are counted with `accumulate_errors`, so the counting stops at the first frame
+        where the early stopping condition is met.
+
+        Parameters
+        ----------
+        messages: iterable
+            (B, K) batches of the sent messages
+        messages_received: iterable
+            the (B, K) batches of the decoded messages, in the same order as ``messages``
+        min_errors: int
+            the minimum number of frame errors before early stopping is allowed
+        min_iters: int
+            the minimum number of frames before early stopping is allowed
+
+        Yields
+        ----------
+        tuple
+            the number of frame errors, the number of bit errors, and the number of frames after each batch
+
+        """
+
+        counts = (0, 0, 0)
+        for sent, received in zip(messages, messages_received):
+            errors = np.not_equal(sent, received, out=self.errors[:len(sent)])
+            counts, stop = accumulate_errors(np.sum(errors, axis=1), counts, min_errors, min_iters)
+            yield counts
+            if stop:
+                return
+
+    def stream(self, Eb_No, num_frames, rng, min_errors=np.inf, min_iters=0):
+        """
+        Chain all of the stages, from the message source to the error counter.
+
+        Parameters
+        ----------
+        Eb_No: float
+            E_b/N_o in decibels
+        num_frames: int
+            the maximum number of frames
+        rng: numpy.random.Generator
+            the random number generator for the messages and the noise
+        min_errors: int
+            the minimum number of frame errors before early stopping is allowed
+        min_iters: int
+            the minimum number of frames before early stopping is allowed
+
+        Returns
+        ----------
+        generator
+            the error counter stage, which yields the number of frame errors, the number of bit errors, and the number
+            of frames after each batch
+
+        """
+
+        # the messages are shared by the encoder and the error counter. The stages run in lockstep, so ``tee`` only
+        # holds one batch at a time.
+        messages, sent = tee(self.source(num_frames, rng))
+        messages_received = self.decode(self.transmit(self.encode(messages), Eb_No, rng))
+        return self.count_errors(sent, messages_received, min_errors, min_iters)
+
+    def run_simulation(self, Eb_No, max_iter, min_errors, min_iters, rng=None):
+        """
+        The same Monte-Carlo simulation as `PolarCode.run_simulation`, through the streaming pipeline.
+
+        Parameters
+        ----------
+        Eb_No: float
+            E_b/N_o in decibels
+        max_iter: int
+            maximum number of frames
+        min_errors: int
+            the minimum number of frame errors before early stopping is allowed
+        min_iters: int
+            the minimum number of frames before early stopping is allowed
+        rng: numpy.random.Generator
+            the random number generator (default is a new generator with an unpredictable seed)
+
+        Returns
+        ----------
+        int, int, int
+            the number of frame errors, the number of bit errors, and the number of frames simulated
+
+        """
+
+        rng = np.random.default_rng() if rng is None else rng
+        counts = (0, 0, 0)
+        for counts in self.stream(Eb_No, max_iter, rng, min_errors, min_iters):
+            pass
+        return counts
@@ -11,8 +11,16 @@ from polarcodes.Construct import Construct
 from polarcodes.Shorten import Shorten
 from polarcodes.Encode import Encode
 from polarcodes.Decode import Decode
+from polarcodes.BatchEncode import BatchEncode
+from polarcodes.BatchDecode import BatchDecode
+from polarcodes.ParallelSimulate import ParallelSimulate
 from polarcodes.AWGN import AWGN
+from polarcodes.CRC import CRC
+from polarcodes.Schedule import Schedule
+from polarcodes.SCD import SCD
 import json
+import os
+import warnings
 import matplotlib.pyplot as plt
 import threading
 import tkinter as tk
@@ -37,10 +45,16 @@ class PolarCode:
         the frozen bit indices
     frozen_lookup: ndarray<int>
         lookup table for the frozen bits
-    x: ndarray<int>
+    x: ndarray<uint8>
         the uncoded message with frozen bits
+    u: ndarray<uint8>
+        the codeword of ``x``, set by `Encode`
     construction_type: string
-        the mothercode construction type
+        the mothercode construction type. Options: {'bb', 'ga', 'pw'}
+    ga_approximation: string
+        the approximation of phi for the 'ga' construction type. Options: {'chung', 'chung_exp'} (see `utils.phi_approximations`)
+    llr_quantisation: tuple
+        the number of bits and the number of fractional bits of the LLRs of the 'quantised_scd' decoder (see `QuantisedSCD`)
     message_received: ndarray<int>
         the decoded message received from a channel
     punct_flag: bool
@@ -51,6 +65,9 @@ class PolarCode:
         the FER values for the SNR values in ``simulated_snr`` using `simulate`
     simulated_ber: ndarray<float>
         the BER values for the SNR values in ``simulated_snr`` using `simulate`
+    simulated_results: dict
+        the results of the last simulation that only apply to its mode, e.g. the FER intervals of `simulate_adaptive`,
+        saved in the JSON file alongside the FER and BER (see `save_results`)
     punct_type: string
         'punct' for puncturing, and 'shorten' for shortening
     punct_set: ndarray<int>
@@ -67,6 +84,17 @@ class PolarCode:
         whether or not to update the frozen indices after puncturing
     recip_flag: bool
         True if ``punct_set`` equals ``source_set``
+    schedule: `Schedule`
+        the cached decoding schedule for ``frozen``, or None. Use `get_schedule` to access it.
+    scd: `SCD`
+        the cached successive cancellation decoder for ``schedule``, or None. Use `get_scd` to access it.
+    crc: `CRC`
+        the CRC outer code, or None. The K message bits include the CRC bits when a CRC is used.
+    construction_cache: `ConstructionCache`
+        a cache for the results of `Construct` and `Shorten`, or None to always construct the code
+    profiler: `Profiler`
+        the per-stage timing counters of `run_simulation`, or None to disable the instrumentation.
+        The worker processes of `ParallelSimulate` are not profiled.
 
     """
 
@@ -84,6 +112,9 @@ class PolarCode:
         """
 
         self.initialise_code(M, K, punct_params)
+        self.crc = None
+        self.construction_cache = None
+        self.profiler = None
         self.status_bar = None  # set by the GUI so that the simulation progress can be tracked
         self.gui_widgets = []
 
@@ -97,22 +128,25 @@ class PolarCode:
         self.M = M
         self.N = int(2**(np.ceil(np.log2(M))))
         self.n = int(np.log2(self.N))
-        self.F = arikan_gen(self.n)
         self.K = K
         self.s = self.N - self.M
         self.reliabilities = np.array([])
         self.frozen = np.array([])
         self.frozen_lookup = np.array([])
-        self.x = np.zeros(self.N, dtype=int)
-        self.u = np.zeros(self.N, dtype=int)
+        self.x = np.zeros(self.N, dtype=np.uint8)
+        self.u = np.zeros(self.N, dtype=np.uint8)
         self.construction_type = 'bb'
+        self.ga_approximation = 'chung'
+        self.llr_quantisation = (6, 2)
         self.message_received = np.array([])
         self.punct_flag = False if self.M == self.N else True
         self.simulated_snr = np.array([])
         self.simulated_fer = np.array([])
         self.simulated_ber = np.array([])
+        self.simulated_results = {}
         self.FERestimate = 0
-        self.T = None
+        self.schedule = None
+        self.scd = None
 
         # puncturing parameters
         self.punct_type = punct_params[0]
@@ -124,6 +158,23 @@ class PolarCode:
         self.update_frozen_flag = punct_params[4]
         self.recip_flag = np.array_equal(np.array(punct_params[2]), np.array(punct_params[3]))
 
+    @property
+    def F(self):
+        """
+        The N x N generator matrix from `arikan_gen`. It is built every time it is accessed, since none of the
+        encoders and decoders use it.
+        """
+
+        return arikan_gen(self.n)
+
+    def __getstate__(self):
+        # the GUI widgets and the profiler callbacks cannot be copied to the worker processes of `ParallelSimulate`
+        state = self.__dict__.copy()
+        state['status_bar'] = None
+        state['profiler'] = None
+        state['gui_widgets'] = []
+        return state
+
     def __str__(self):
         """
         A string definition of PolarCode. This allows you to print any PolarCode object and see all of its
@@ -151,9 +202,241 @@ class PolarCode:
         output += "                        update_frozen_flag: " + str(self.update_frozen_flag) + "}" + '\n'
         return output
 
+    def set_crc(self, polynomial='crc11'):
+        """
+        Attach a CRC outer code to this polar code. The CRC bits are appended to each message, and they are used by the
+        'scl' decoder to select the decoded message.
+
+        Parameters
+        ----------
+        polynomial: string, ndarray<int>, None
+            the name or the coefficients of the CRC generator polynomial (see `CRC`), or None to remove the CRC
+
+        """
+
+        self.crc = None if polynomial is None else CRC(polynomial)
+
+    def get_config(self):
+        """
+        The parameters that define this polar code after its construction, which can be saved as JSON and given to
+        `from_config` to build the same code again.
+
+        Returns
+        ----------
+        dict
+            the block length, the code dimension, the puncturing parameters, the frozen set, the reliabilities,
+            the construction and decoder settings, and the CRC polynomial (or None)
+
+        """
+
+        return {
+            'M': self.M,
+            'K': self.K,
+            'punct_params': [self.punct_type, self.punct_algorithm, self.punct_set.tolist(), self.source_set.tolist(),
+                             self.update_frozen_flag],
+            'frozen': np.asarray(self.frozen, dtype=int).tolist(),
+            'reliabilities': np.asarray(self.reliabilities, dtype=int).tolist(),
+            'FERestimate': float(self.FERestimate),
+            'construction_type': self.construction_type,
+            'ga_approximation': self.ga_approximation,
+            'llr_quantisation': list(self.llr_quantisation),
+            'crc': None if self.crc is None else (self.crc.name or self.crc.g.tolist()),
+        }
+
+    @staticmethod
+    def from_config(config):
+        """
+        Build a polar code from the parameters of `get_config`, without constructing it again.
+
+        Parameters
+        ----------
+        config: dict
+            the parameters returned by `get_config`
+
+        Returns
+        ----------
+        `PolarCode`
+            the polar code
+
+        """
+
+        myPC = PolarCode(config['M'], config['K'], tuple(config['punct_params']))
+        myPC.frozen = np.array(config['frozen'], dtype=int)
+        myPC.frozen_lookup = myPC.get_lut(myPC.frozen)
+        myPC.reliabilities = np.array(config['reliabilities'], dtype=int)
+        myPC.FERestimate = config['FERestimate']
+        myPC.construction_type = config['construction_type']
+        myPC.ga_approximation = config['ga_approximation']
+        myPC.llr_quantisation = tuple(config['llr_quantisation'])
+        myPC.set_crc(config['crc'])
+        return myPC
+
+    def save_checkpoint(self, filename, checkpoint):
+        """
+        Write a checkpoint of `simulate` as a JSON file. The file is written to a temporary file first and then
+        renamed, so a crash while writing leaves the previous checkpoint intact.
+
+        Parameters
+        ----------
+        filename: string
+            the checkpoint file
+        checkpoint: dict
+            the state of the simulation
+
+        """
+
+        tmp_filename = filename + '.' + str(os.getpid()) + '.tmp'
+        try:
+            with open(tmp_filename, 'w', encoding='utf-8') as f:
+                json.dump(checkpoint, f)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            os.remove(tmp_filename)
+            raise
+        os.replace(tmp_filename, filename)  # atomic, so the checkpoint is never partially written
+
+    @staticmethod
+    def resume(checkpoint_filename):
+        """
+        Continue a simulation from the checkpoint file of `simulate`. The polar code is built from the saved
+        configuration, the SNRs that were completed are restored, and the current SNR continues from its saved counts
+        and random generator state, so the results are the same as if the simulation had not been stopped.
+
+        Parameters
+        ----------
+        checkpoint_filename: string
+            the checkpoint file given as ``checkpoint_to`` to `simulate`
+
+        Returns
+        ----------
+        `PolarCode`
+            the polar code, with the results of the completed simulation
+
+        """
+
+        with open(checkpoint_filename, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        myPC = PolarCode.from_config(checkpoint['config'])
+        sim_params = dict(checkpoint['simulation'])
+        sim_params['Eb_No_vec'] = np.array(sim_params['Eb_No_vec'])
+        myPC.simulate(manual_const_flag=True, resume_state=checkpoint, **sim_params)
+        return myPC
+
+    def get_schedule(self):
+        """
+        Get the decoding schedule for the current frozen set. The schedule is built once and cached, and it is rebuilt
+        if the block length or ``frozen`` have changed since it was built.
+
+        Returns
+        ----------
+        `Schedule`
+            the decoding schedule used by the decoders
+
+        """
+
+        if self.schedule is None or not self.schedule.matches(self.N, self.frozen):
+            self.schedule = Schedule(self.N, self.frozen)
+        return self.schedule
+
+    def get_error_events(self, max_events=512, seed=0):
+        """
+        The dominant error events of this code, for importance sampling with `run_importance_simulation`.
+        The first decoding error is most likely in an information bit i with one of the two lowest row weights 2^wt(i) of
+        the polar transform, and it changes the codeword by a codeword of the lowest weight in the coset of row i, i.e.
+        with u_i = 1 and u_j = 0 for j < i. These codewords are the indicators of affine subspaces of {0,...,N-1}, which are
+        sampled from the images of the support of row i under random affine maps, and kept if they are in the coset.
+        The shortened/punctured positions are not part of the events, since their likelihoods do not depend on the noise.
+
+        Parameters
+        ----------
+        max_events: int
+            the maximum number of events, which are shared equally by the two row weights, and then by their bits
+        seed: int
+            the seed of the random generator for the affine maps, which is separate from the simulation
+
+        Returns
+        ----------
+        ndarray<uint8>
+            an (E, N) array, with a 1 at each position of the codeword that each error event changes
+
+        -------------
+        **References:**
+
+        *  Bardet, M., Dragoi, V., Otmani, A., & Tillich, J.-P. (2016). Algebraic properties of polar codes from a new polynomial formalism. 2016 IEEE International Symposium on Information Theory, 230–234.
+
+        """
+
+        rng = np.random.default_rng(seed)
+        frozen_mask = self.frozen_lookup == 0
+        info = np.flatnonzero(self.frozen_lookup == 1)
+        row_weights = 2 ** hamming_wt(info, self.n)
+        weight_classes = np.unique(row_weights)[:2]
+        events = []
+        for i in info[row_weights <= weight_classes[-1]]:
+            per_bit = max(1, max_events // (len(weight_classes) * np.sum(row_weights == row_weights[info == i])))
+            # the support of row i is the span of the set bits of i. The support can be translated by a zero bit o, and
+            # the basis vector of bit l can be shifted by a higher zero bit o, if the row with that change is not frozen.
+            translations = np.array([o for o in range(self.n) if not (i >> o) & 1 and self.frozen_lookup[i + (1 << o)] == 1], dtype=int)
+            basis_shifts = [(l, np.array([o for o in range(l + 1, self.n)
+                                          if not (i >> o) & 1 and self.frozen_lookup[i - (1 << l) + (1 << o)] == 1], dtype=int))
+                            for l in range(self.n) if (i >> l) & 1]
+            found = np.zeros((0, self.N), dtype=np.uint8)
+            C = 4 * per_bit
+            for attempt in range(20):
+                points = (rng.integers(2, size=(C, len(translations))) @ (1 << translations))[:, None]
+                for l, shifts in basis_shifts:
+                    v = (1 << l) + rng.integers(2, size=(C, len(shifts))) @ (1 << shifts)
+                    points = np.hstack((points, points ^ v[:, None]))
+                x = np.zeros((C, self.N), dtype=np.uint8)
+                x[np.arange(C)[:, None], points] = 1
+
+                # keep the codewords in the coset of row i, until there are enough or no new ones are found
+                u = polar_transform(x)
+                valid = np.logical_and(~np.any(u[:, frozen_mask], axis=1), np.argmax(u, axis=1) == i)
+                num_found = len(found)
+                found = np.unique(np.vstack((found, x[valid])), axis=0)
+                if len(found) >= per_bit or len(found) == num_found:
+                    break
+            events.append(found[:per_bit])
+        events = np.vstack(events)
+        if self.punct_flag:
+            events[:, self.source_set_lookup == 0] = 0
+        return events[np.any(events, axis=1)]
+
+    def get_scd(self):
+        """
+        Get the successive cancellation decoder for the current frozen set. The decoder and its workspace are kept
+        between frames, and the decoder is rebuilt if the decoding schedule has changed.
+
+        Returns
+        ----------
+        `SCD`
+            the decoder used by `Decode` for 'scd'
+
+        """
+
+        if self.scd is None or self.scd.schedule is not self.get_schedule():
+            self.scd = SCD(self)
+        return self.scd
+
+    def get_message_length(self):
+        """
+        Returns
+        ----------
+        int
+            the number of message bits, which is K minus the number of CRC bits
+
+        """
+
+        if self.crc is None:
+            return self.K
+        return self.K - self.crc.r
+
     def set_message(self, m):
         """
         Set the message vector to the non-frozen bits in ``x``. The frozen bits in ``frozen`` are set to zero.
+        If a CRC is used, the CRC bits are appended to the message first.
 
         Parameters
         ----------
@@ -163,6 +446,8 @@ class PolarCode:
         """
 
         self.message = m
+        if self.crc is not None:
+            m = self.crc.encode(m)
         self.x[self.frozen_lookup == 1] = m
         self.u = self.x.copy()
 
@@ -250,25 +535,45 @@ class PolarCode:
             'FER': self.simulated_fer.tolist(),
             'SNR': self.simulated_snr.tolist()
         }
+        data.update(self.simulated_results)
+        if self.profiler is not None:
+            data['profile'] = self.profiler.summary()
         with open(sim_filename + '.json', 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
 
-    def run_simulation(self, Eb_No, max_iter, min_errors, min_iters):
+    def run_simulation(self, Eb_No, max_iter, min_errors, min_iters, batch_size=None, decoder_name=None, reference_decoder=None):
+        if batch_size is not None or reference_decoder is not None:
+            return self.run_batch_simulation(Eb_No, max_iter, min_errors, min_iters, 256 if batch_size is None else batch_size,
+                                             decoder_name, reference_decoder)
+
         frame_error_count = 0
         bit_error_count = 0
         num_blocks = 0
+        profiler = self.profiler
         for i in range(1, max_iter + 1):
             # simulate random PC in an AWGN channel
-            self.set_message(np.random.randint(2, size=self.K))
-            Encode(self)
+            if profiler is not None:
+                profiler.start()
+            self.set_message(np.random.randint(2, size=self.get_message_length()))
+            if profiler is not None:
+                profiler.lap('source')
+            Encode(self, 'polar_encode_vectorised')
+            if profiler is not None:
+                profiler.lap('encode')
             AWGN(self, Eb_No)
-            Decode(self)
+            if profiler is not None:
+                profiler.lap('channel')
+            Decode(self, 'scd' if decoder_name is None else decoder_name)
+            if profiler is not None:
+                profiler.lap('decode')
 
             # detect errors
             error_vec = self.message ^ self.message_received
             num_errors = sum(error_vec)
-            frame_error_count = frame_error_count + (num_errors > 1)
+            frame_error_count = frame_error_count + frame_errors(num_errors)
             bit_error_count = bit_error_count + num_errors
+            if profiler is not None:
+                profiler.lap('errors')
 
             # early stopping condition
             num_blocks = i
@@ -276,39 +581,267 @@ class PolarCode:
                 break
         return frame_error_count, bit_error_count, num_blocks
 
-    def simulate(self, save_to, Eb_No_vec, design_SNR=None, max_iter=100000, min_iterations=1000, min_errors=30, sim_seed=1729, manual_const_flag=True):
+    def run_batch_simulation(self, Eb_No, max_iter, min_errors, min_iters, batch_size, decoder_name=None, reference_decoder=None):
         """
-        Monte-carlo simulation of the performance of this polar code.
-        The simulation has an early stopping condition of when the number of errors is below min_errors.
-        Each E_b/N_o simulation has an additional early stopping condition using the minimum iterations
-        and the minimum number of errors. The results are saved in a JSON file using :func:`save_as_json`.
+        The same Monte-Carlo simulation as `run_simulation`, with the frames simulated in batches. Each batch of messages
+        is encoded by `BatchEncode`, transmitted by `AWGN.get_batch_likelihoods` and decoded by `BatchDecode`.
+        The random numbers are drawn per batch rather than per frame, so the frames differ from `run_simulation` for the
+        same seed. The early stopping condition is checked for every frame in a batch, so the error counts stop at the same
+        frame as the frame-by-frame simulation. A reference decoder, e.g. a floating-point decoder for a quantised one,
+        can also decode the same frames, and its errors are counted without affecting the early stopping.
+
+        Parameters
+        ----------
+        Eb_No: float
+            E_b/N_o in decibels
+        max_iter: int
+            maximum number of frames
+        min_errors: int
+            the minimum number of frame errors before early stopping is allowed
+        min_iters: int
+            the minimum number of frames before early stopping is allowed
+        batch_size: int
+            the number of frames decoded at once
+        decoder_name: string
+            the name of the `BatchDecode` decoder (default is 'vscd')
+        reference_decoder: string
+            the name of a `BatchDecode` decoder that also decodes every frame, or None
+
+        Returns
+        ----------
+        int, int, int
+            the number of frame errors, the number of bit errors, and the number of frames simulated.
+            If ``reference_decoder`` is given, these counts are followed by the counts of the reference decoder.
+
+        """
+
+        encoder = BatchEncode(self)
+        channel = AWGN(self, Eb_No, manual=True)
+        decoder = BatchDecode(self, 'vscd' if decoder_name is None else decoder_name)
+        reference = None if reference_decoder is None else BatchDecode(self, reference_decoder)
+        counts = (0, 0, 0)
+        reference_counts = (0, 0, 0)
+        profiler = self.profiler
+        while counts[2] < max_iter:
+            # simulate a batch of random PCs in an AWGN channel
+            if profiler is not None:
+                profiler.start()
+            B = min(batch_size, max_iter - counts[2])
+            messages = np.random.randint(2, size=(B, self.get_message_length()))
+            if profiler is not None:
+                profiler.lap('source', B)
+            codewords = encoder.encode(messages)
+            if profiler is not None:
+                profiler.lap('encode', B)
+            llrs = channel.get_batch_likelihoods(codewords)
+            if profiler is not None:
+                profiler.lap('channel', B)
+            messages_received = decoder.decode(llrs)
+            if profiler is not None:
+                profiler.lap('decode', B)
+
+            # detect errors, with the early stopping condition checked for each frame
+            num_errors = np.sum(messages ^ messages_received, axis=1)
+            num_frames = counts[2]
+            counts, stop = accumulate_errors(num_errors, counts, min_errors, min_iters)
+            if profiler is not None:
+                profiler.lap('errors', B)
+            if reference is not None:  # count the reference errors over the same frames
+                reference_errors = np.sum(messages ^ reference.decode(llrs), axis=1)[:counts[2] - num_frames]
+                reference_counts, _ = accumulate_errors(reference_errors, reference_counts, np.inf, np.inf)
+                if profiler is not None:
+                    profiler.lap('reference', B)
+            if stop:
+                break
+        if reference is not None:
+            return counts + reference_counts
+        return counts
+
+    def run_adaptive_simulation(self, Eb_No_vec, run_frames, ci_width, confidence, chunk_size, max_iter, total_budget):
+        """
+        Spread a budget of frames over the SNR points of a simulation, until the confidence interval of the FER at
+        every point is narrower than ``ci_width`` relative to the FER. Every point is first simulated for one chunk of
+        frames. Each further chunk is given to the point with the largest expected information gain, measured as the
+        expected decrease of its relative interval width (down to ``ci_width``), so the frames go to the points with
+        the least reliable FER rather than to the points with many frame errors. A point is finished when its
+        interval is narrow enough, or when it has ``max_iter`` frames.
 
         Parameters
         ----------
-        save_to: string
-            directory and filename to save JSON file to (excluding extension)
         Eb_No_vec: ndarray<float>
             the range of SNR values to simulate
-        design_SNR: float
-            the construction design SNR, E_b/N_o
+        run_frames: function
+            simulates a number of frames as ``run_frames(Eb_No, num_frames)``, and returns the counts of `run_simulation`
+        ci_width: float
+            the target width of the confidence interval, relative to the FER
+        confidence: float
+            the confidence level of the interval
+        chunk_size: int
+            the number of frames that are simulated at once for a point
         max_iter: int
-            maximum number of iterations per SNR
-        min_iterations: int
-            the minimum number of iterations before early stopping is allowed per SNR
+            maximum number of frames per SNR
+        total_budget: int
+            maximum number of frames over all of the SNRs, although every point is simulated for at least one chunk
+
+        Returns
+        ----------
+        list<tuple>
+            the counts at each SNR, in the same format as `run_simulation`
+
+        """
+
+        counts = [np.array(run_frames(Eb_No, min(chunk_size, max_iter))) for Eb_No in Eb_No_vec]
+        budget = total_budget - sum(c[2] for c in counts)
+        while budget > 0:
+            frame_error_counts = np.array([c[0] for c in counts])
+            num_frames = np.array([c[2] for c in counts])
+            lower, upper = fer_confidence_interval(frame_error_counts, num_frames, confidence)
+            with np.errstate(divide='ignore'):
+                width = (upper - lower) * num_frames / frame_error_counts  # inf without frame errors
+            active = np.logical_and(width > ci_width, num_frames < max_iter)
+            if not np.any(active):
+                break
+
+            # the expected relative width from the normal approximation, using a smoothed FER for points without errors
+            fer = (frame_error_counts + 0.5) / (num_frames + 1)
+            next_width = expected_relative_width(fer, np.minimum(num_frames + chunk_size, max_iter), confidence)
+            gain = expected_relative_width(fer, num_frames, confidence) - np.maximum(next_width, ci_width)
+            i = np.argmax(np.where(active, gain, -np.inf))
+            num = min(chunk_size, max_iter - num_frames[i], budget)
+            counts[i] += np.array(run_frames(Eb_No_vec[i], num))
+            budget -= num
+        return [tuple(int(c) for c in point_counts) for point_counts in counts]
+
+    def run_checkpointed_simulation(self, Eb_No, max_iter, min_errors, min_iters, batch_size, decoder_name, reference_decoder,
+                                    checkpoint_frames, counts, save_checkpoint):
+        """
+        Run `run_simulation` in segments of ``checkpoint_frames`` frames, and call ``save_checkpoint(counts)`` after
+        each segment. The early stopping condition of each segment is offset by the counts of the previous segments, so
+        the counts are the same as for one call of `run_simulation` when ``checkpoint_frames`` is a multiple of the
+        batch size.
+
+        Parameters
+        ----------
+        counts: tuple
+            the counts of `run_simulation` that were saved in a checkpoint for this SNR, or None to start again
+
+        Returns
+        ----------
+        tuple
+            the counts of `run_simulation`
+
+        """
+
+        stop = counts is not None and counts[0] >= min_errors and counts[2] >= min_iters
+        while not stop and (counts is None or counts[2] < max_iter):
+            done = (0, 0, 0) if counts is None else counts
+            segment = self.run_simulation(Eb_No, min(checkpoint_frames, max_iter - done[2]), min_errors - done[0],
+                                          min_iters - done[2], batch_size, decoder_name, reference_decoder)
+            counts = tuple(int(c) for c in (segment if counts is None else np.add(counts, segment)))
+            stop = counts[0] >= min_errors and counts[2] >= min_iters
+            save_checkpoint(counts)
+        return counts
+
+    def run_importance_simulation(self, Eb_No, max_iter, min_errors, min_iters, batch_size, shift, decoder_name=None, defensive=0.3):
+        """
+        Simulate batches of frames with importance sampling, using `AWGN.get_biased_batch_likelihoods` with the error
+        events of `get_error_events`. The noise is shifted towards the dominant error events so that frame errors are
+        much more likely, and each frame is weighted by the likelihood ratio of its noise, which gives unbiased
+        estimates of the FER and BER of the AWGN channel from far fewer frames than `run_simulation` in the low FER
+        region. Any frame with a bit error is a frame error, as in `run_simulation`.
+        Most of the frames have errors under the shifted noise, but their weights differ, so the early stopping
+        condition uses the effective number of frame errors (the Kish effective sample size of the weighted frame
+        errors), and it is checked after each batch. A warning is given if the effective number of frame errors is
+        still less than ``min_errors`` after ``max_iter`` frames, since the estimates then depend on a few heavily
+        weighted frames, and their variances are not reliable.
+
+        Parameters
+        ----------
+        Eb_No: float
+            the SNR, E_b/N_o
+        max_iter: int
+            maximum number of frames
         min_errors: int
-            the minimum number of frame errors before early stopping is allowed per SNR
-        sim_seed: int
-            pseudo-random generator seed, default is 1729 ('twister' on MATLAB)
-        manual_const_flag: bool
-            a flag that decides if construction should be done before simulating.
-            Set to False if mothercode and/or puncturing constructions are manually set by the user.
+            the minimum effective number of frame errors before early stopping is allowed
+        min_iters: int
+            the minimum number of frames before early stopping is allowed
+        batch_size: int
+            the number of frames per batch
+        shift: float
+            the mean shift of the noise on the positions of an error event, as a fraction of the distance to the
+            decision boundary. A shift of 1 moves the noise onto the boundary of the most likely error.
+        decoder_name: string
+            the name of a batch decoder (see `BatchDecode`). Default is 'vscd'.
+        defensive: float
+            the fraction of frames that are simulated without shifted noise, which bounds the weights by 1/``defensive``
+
+        Returns
+        ----------
+        tuple
+            the number of frame errors, the number of bit errors and the number of frames under the shifted noise,
+            followed by the weighted estimates of the FER, the BER, the variances of the two estimates, and the
+            effective number of frame errors (the Kish effective sample size of the weighted frame errors)
 
         """
 
-        # initialise simulation
+        encoder = BatchEncode(self)
+        channel = AWGN(self, Eb_No, manual=True)
+        decoder = BatchDecode(self, 'vscd' if decoder_name is None else decoder_name)
+        K = self.get_message_length()
+        events = self.get_error_events()
+        counts = (0, 0, 0)
+        weighted_sums = np.zeros(4)  # sums of w*e and (w*e)^2 for the frame errors and the bit errors
+        profiler = self.profiler
+        while counts[2] < max_iter:
+            # simulate a batch of random PCs in an AWGN channel with shifted noise
+            if profiler is not None:
+                profiler.start()
+            B = min(batch_size, max_iter - counts[2])
+            messages = np.random.randint(2, size=(B, K))
+            if profiler is not None:
+                profiler.lap('source', B)
+            codewords = encoder.encode(messages)
+            if profiler is not None:
+                profiler.lap('encode', B)
+            llrs, log_weights = channel.get_biased_batch_likelihoods(codewords, shift, events, defensive)
+            if profiler is not None:
+                profiler.lap('channel', B)
+            messages_received = decoder.decode(llrs)
+            if profiler is not None:
+                profiler.lap('decode', B)
+
+            # weight the error events by their likelihood ratios
+            num_errors = np.sum(messages ^ messages_received, axis=1)
+            weights = np.exp(log_weights)
+            weighted_frame_errors = weights * frame_errors(num_errors)
+            weighted_bit_errors = weights * num_errors
+            weighted_sums += [np.sum(weighted_frame_errors), np.sum(weighted_frame_errors ** 2),
+                              np.sum(weighted_bit_errors), np.sum(weighted_bit_errors ** 2)]
+            counts = (counts[0] + int(np.sum(frame_errors(num_errors))), counts[1] + int(np.sum(num_errors)), counts[2] + B)
+            effective_errors = weighted_sums[0] ** 2 / weighted_sums[1] if weighted_sums[1] > 0 else 0
+            if profiler is not None:
+                profiler.lap('errors', B)
+            if effective_errors >= min_errors and counts[2] >= min_iters:
+                break
+
+        # the estimates are sample means over the frames, so their variances are the sample variances over the frames
+        num_frames = counts[2]
+        fer = weighted_sums[0] / num_frames
+        ber = weighted_sums[2] / (num_frames * K)
+        fer_variance = max(weighted_sums[1] / num_frames - fer ** 2, 0) / num_frames
+        ber_variance = max(weighted_sums[3] / (num_frames * K ** 2) - ber ** 2, 0) / num_frames
+        if effective_errors < min_errors:
+            warnings.warn("Importance sampling at Eb/No = " + str(Eb_No) + " dB only has " + str(round(effective_errors, 1)) +
+                          " effective frame errors, so its FER and BER variances are not reliable.")
+        return counts + (fer, ber, fer_variance, ber_variance, effective_errors)
+
+    def start_simulation(self, design_SNR, sim_seed, manual_const_flag):
+        """
+        Seed the random generator, construct the code if it is not constructed manually, and print the code before
+        simulating. Used by `simulate`, `simulate_adaptive` and `simulate_importance`.
+        """
+
         np.random.seed(sim_seed)
-        frame_error_rates = np.zeros(len(Eb_No_vec))
-        bit_error_rates = np.zeros(len(Eb_No_vec))
 
         # do construction if not done already
         if not manual_const_flag:
@@ -319,31 +852,49 @@ class PolarCode:
 
         print(self)
         print('=' * 10, "Simulation", '=' * 10)
-        for i in range(len(Eb_No_vec)):
-            # run simulation for the current SNR
-            frame_error_count, bit_error_count, num_blocks = self.run_simulation(Eb_No_vec[i], max_iter, min_errors, min_iterations)
 
-            # calculate FER and BER
-            frame_error_rate = frame_error_count / num_blocks
-            bit_error_rate = bit_error_count / (self.K * num_blocks)
-            frame_error_rates[i] = frame_error_rate
-            bit_error_rates[i] = bit_error_rate
-            print("Eb/No:", round(Eb_No_vec[i], 5), "  FER:", round(frame_error_rate, 3), "  BER:", round(bit_error_rate, 5))
-            print('# Iterations:', num_blocks, '  # Frame Errors:', frame_error_count, ' # Bit Errors:', bit_error_count)
-            print('='*20)
+    def report_snr(self, i, Eb_No_vec, frame_error_rate, bit_error_rate, counts, notes=()):
+        """
+        Print the results of the ``i``-th SNR of a simulation, followed by the mode-specific lines in ``notes``, and
+        update the progress of the GUI (if used).
+        """
 
-            # update GUI (if used)
-            if self.status_bar != None:
-                self.status_bar.set("Simulation progress: " + str(i + 1) + "/" + str(len(Eb_No_vec)))
+        print("Eb/No:", round(Eb_No_vec[i], 5), "  FER:", round(frame_error_rate, 3), "  BER:", round(bit_error_rate, 5))
+        print('# Iterations:', counts[2], '  # Frame Errors:', counts[0], ' # Bit Errors:', counts[1])
+        for note in notes:
+            print(note)
+        print('='*20)
 
-            # early stopping condition
-            if frame_error_count < min_errors:
-                break
+        # update GUI (if used)
+        if self.status_bar != None:
+            self.status_bar.set("Simulation progress: " + str(i + 1) + "/" + str(len(Eb_No_vec)))
+
+    def save_results(self, save_to, Eb_No_vec, frame_error_rates, bit_error_rates, results=None):
+        """
+        Keep the results of a simulation, save them in a JSON file using :func:`save_as_json`, and update the GUI
+        (if used). Shared by `simulate`, `simulate_adaptive` and `simulate_importance`.
+
+        Parameters
+        ----------
+        save_to: string
+            directory and filename to save JSON file to (excluding extension)
+        Eb_No_vec: ndarray<float>
+            the range of SNR values simulated
+        frame_error_rates: ndarray<float>
+            the FER of each SNR
+        bit_error_rates: ndarray<float>
+            the BER of each SNR
+        results: dict
+            the results that only apply to the simulation mode, as JSON fields, e.g. the FER intervals of
+            `simulate_adaptive`
+
+        """
 
         # write data to JSON file
         self.simulated_snr = Eb_No_vec
         self.simulated_ber = bit_error_rates
         self.simulated_fer = frame_error_rates
+        self.simulated_results = {} if results is None else results
         self.save_as_json(save_to)
 
         # update GUI construction fields (if used)
@@ -358,6 +909,293 @@ class PolarCode:
         if self.status_bar != None:
             self.status_bar.set("Simulation progress: Done.")
 
+    def simulate(self, save_to, Eb_No_vec, design_SNR=None, max_iter=100000, min_iterations=1000, min_errors=30, sim_seed=1729, manual_const_flag=True, batch_size=None, num_workers=None, decoder_name=None, reference_decoder=None, checkpoint_to=None, checkpoint_frames=100000, resume_state=None):
+        """
+        Monte-carlo simulation of the performance of this polar code.
+        The simulation has an early stopping condition of when the number of errors is below min_errors.
+        Each E_b/N_o simulation has an additional early stopping condition using the minimum iterations
+        and the minimum number of errors. The results are saved in a JSON file using :func:`save_as_json`.
+        A frame with at least one bit error is a frame error (see `utils.frame_errors`), as in `simulate_adaptive`
+        and `simulate_importance`.
+
+        Parameters
+        ----------
+        save_to: string
+            directory and filename to save JSON file to (excluding extension)
+        Eb_No_vec: ndarray<float>
+            the range of SNR values to simulate
+        design_SNR: float
+            the construction design SNR, E_b/N_o
+        max_iter: int
+            maximum number of iterations per SNR
+        min_iterations: int
+            the minimum number of iterations before early stopping is allowed per SNR
+        min_errors: int
+            the minimum number of frame errors before early stopping is allowed per SNR
+        sim_seed: int
+            pseudo-random generator seed, default is 1729 ('twister' on MATLAB)
+        manual_const_flag: bool
+            a flag that decides if construction should be done before simulating.
+            Set to False if mothercode and/or puncturing constructions are manually set by the user.
+            The construction is loaded from ``construction_cache`` if it is set and the construction is cached.
+        batch_size: int
+            if given, the frames are decoded in batches of this size using `BatchDecode`
+        num_workers: int
+            if given, the frames are split over this many processes using `ParallelSimulate`, in chunks of
+            ``batch_size`` frames (default is 256). Each process uses its own random generator spawned from ``sim_seed``.
+        decoder_name: string
+            the name of the decoder (default is 'scd' for frame-by-frame simulations and 'vscd' for batches).
+            The 'scl' decoder can only be simulated frame by frame.
+        reference_decoder: string
+            if given, the frames are also decoded in batches by this decoder, e.g. 'vscd_min_sum' for the FER gap of
+            'quantised_scd' against floating point. Its FER and the FER gap are saved in the JSON file.
+        checkpoint_to: string
+            if given, a checkpoint of the counts of each SNR, the random generator state and the code configuration is
+            written to this file after every ``checkpoint_frames`` frames and after every SNR, using `save_checkpoint`.
+            Continue a stopped simulation with `resume`. It cannot be combined with ``num_workers``.
+        checkpoint_frames: int
+            the number of frames between checkpoints, rounded up to a multiple of the batch size
+        resume_state: dict
+            the checkpoint to continue from, used by `resume`
+
+        """
+
+        batched = batch_size is not None or num_workers is not None or reference_decoder is not None
+        if (batched and decoder_name is not None and decoder_name.endswith('scl')) or (reference_decoder is not None and reference_decoder.endswith('scl')):
+            raise ValueError("The 'scl' decoder has no batch decoder, so it cannot be combined with batch_size, num_workers or reference_decoder")
+        if checkpoint_to is not None and num_workers is not None:
+            raise ValueError("Checkpoints cannot be combined with num_workers")
+
+        # initialise simulation
+        self.start_simulation(design_SNR, sim_seed, manual_const_flag)
+        frame_error_rates = np.zeros(len(Eb_No_vec))
+        bit_error_rates = np.zeros(len(Eb_No_vec))
+        reference_frame_error_rates = np.zeros(len(Eb_No_vec))
+
+        # restore a checkpoint, and save the state of the simulation that is needed to continue it
+        completed_counts = []
+        partial_counts = None
+        if resume_state is not None:
+            completed_counts = [tuple(counts) for counts in resume_state['completed_counts']]
+            partial_counts = resume_state['partial_counts']
+            rng_state = resume_state['rng_state']
+            np.random.set_state((rng_state[0], np.array(rng_state[1], dtype=np.uint32)) + tuple(rng_state[2:]))
+        if checkpoint_to is not None:
+            batch = batch_size if batch_size is not None else (256 if reference_decoder is not None else 1)
+            checkpoint_frames = -(-checkpoint_frames // batch) * batch
+            checkpoint = {
+                'config': self.get_config(),
+                'simulation': {
+                    'save_to': save_to,
+                    'Eb_No_vec': np.asarray(Eb_No_vec, dtype=float).tolist(),
+                    'max_iter': max_iter,
+                    'min_iterations': min_iterations,
+                    'min_errors': min_errors,
+                    'sim_seed': sim_seed,
+                    'batch_size': batch_size,
+                    'decoder_name': decoder_name,
+                    'reference_decoder': reference_decoder,
+                    'checkpoint_to': checkpoint_to,
+                    'checkpoint_frames': checkpoint_frames,
+                },
+            }
+            def save_checkpoint(counts):
+                rng_state = np.random.get_state()
+                checkpoint['completed_counts'] = completed_counts
+                checkpoint['partial_counts'] = counts
+                checkpoint['rng_state'] = [rng_state[0], rng_state[1].tolist()] + [rng_state[i] for i in range(2, len(rng_state))]
+                self.save_checkpoint(checkpoint_to, checkpoint)
+
+        if num_workers is not None:
+            parallel_sim = ParallelSimulate(self, num_workers, 256 if batch_size is None else batch_size, sim_seed,
+                                            'vscd' if decoder_name is None else decoder_name, reference_decoder)
+        try:
+            for i in range(len(Eb_No_vec)):
+                # run simulation for the current SNR
+                if i < len(completed_counts):
+                    counts = completed_counts[i]  # restored from the checkpoint
+                elif checkpoint_to is not None:
+                    counts = self.run_checkpointed_simulation(Eb_No_vec[i], max_iter, min_errors, min_iterations, batch_size, decoder_name,
+                                                              reference_decoder, checkpoint_frames, partial_counts, save_checkpoint)
+                    partial_counts = None
+                    completed_counts.append(counts)
+                    save_checkpoint(None)
+                elif num_workers is not None:
+                    counts = parallel_sim.run_simulation(Eb_No_vec[i], max_iter, min_errors, min_iterations)
+                else:
+                    counts = self.run_simulation(Eb_No_vec[i], max_iter, min_errors, min_iterations, batch_size, decoder_name, reference_decoder)
+                frame_error_count, bit_error_count, num_blocks = counts[:3]
+
+                # calculate FER and BER
+                frame_error_rates[i] = frame_error_count / num_blocks
+                bit_error_rates[i] = bit_error_count / (self.get_message_length() * num_blocks)
+                notes = []
+                if reference_decoder is not None:
+                    reference_frame_error_rates[i] = counts[3] / num_blocks
+                    notes.append("Reference FER: " + str(round(reference_frame_error_rates[i], 3)) + "  FER gap: " +
+                                 str(round(frame_error_rates[i] - reference_frame_error_rates[i], 3)))
+                self.report_snr(i, Eb_No_vec, frame_error_rates[i], bit_error_rates[i], counts[:3], notes)
+
+                # early stopping condition
+                if frame_error_count < min_errors:
+                    break
+        finally:
+            if num_workers is not None:
+                parallel_sim.close()
+
+        results = {}
+        if reference_decoder is not None:
+            results['reference_decoder'] = reference_decoder
+            results['reference_FER'] = reference_frame_error_rates.tolist()
+            results['FER_gap'] = (frame_error_rates - reference_frame_error_rates).tolist()
+        self.save_results(save_to, Eb_No_vec, frame_error_rates, bit_error_rates, results)
+
+    def simulate_adaptive(self, save_to, Eb_No_vec, ci_width, confidence=0.95, total_budget=None, design_SNR=None, max_iter=100000, chunk_size=1000, sim_seed=1729, manual_const_flag=True, batch_size=None, num_workers=None, decoder_name=None):
+        """
+        Adaptive monte-carlo simulation of the performance of this polar code (see `run_adaptive_simulation`). The
+        frames are spread over all of the SNRs in chunks of ``chunk_size`` frames, until the confidence interval of
+        each FER is narrower than ``ci_width`` times the FER, or the budget is spent. The results are saved in a JSON
+        file using :func:`save_as_json`, together with the interval bounds and the number of frames of each SNR.
+
+        Parameters
+        ----------
+        save_to: string
+            directory and filename to save JSON file to (excluding extension)
+        Eb_No_vec: ndarray<float>
+            the range of SNR values to simulate
+        ci_width: float
+            the target width of the confidence interval, relative to the FER (e.g. 0.5 for +/- 25%)
+        confidence: float
+            the confidence level of the FER intervals
+        total_budget: int
+            maximum number of frames over all of the SNRs (default is ``max_iter`` per SNR)
+        design_SNR: float
+            the construction design SNR, E_b/N_o
+        max_iter: int
+            maximum number of iterations per SNR
+        chunk_size: int
+            the number of frames that are simulated at once for an SNR
+        sim_seed: int
+            pseudo-random generator seed, default is 1729 ('twister' on MATLAB)
+        manual_const_flag: bool
+            a flag that decides if construction should be done before simulating, as in `simulate`
+        batch_size: int
+            if given, the frames are decoded in batches of this size using `BatchDecode`
+        num_workers: int
+            if given, the frames are split over this many processes using `ParallelSimulate`, as in `simulate`
+        decoder_name: string
+            the name of the decoder (default is 'scd' for frame-by-frame simulations and 'vscd' for batches)
+
+        """
+
+        if (batch_size is not None or num_workers is not None) and decoder_name is not None and decoder_name.endswith('scl'):
+            raise ValueError("The 'scl' decoder has no batch decoder, so it cannot be combined with batch_size or num_workers")
+
+        # initialise simulation
+        self.start_simulation(design_SNR, sim_seed, manual_const_flag)
+        frame_error_rates = np.zeros(len(Eb_No_vec))
+        bit_error_rates = np.zeros(len(Eb_No_vec))
+        fer_intervals = np.zeros((len(Eb_No_vec), 2))
+        frames = np.zeros(len(Eb_No_vec), dtype=int)
+
+        if num_workers is not None:
+            parallel_sim = ParallelSimulate(self, num_workers, 256 if batch_size is None else batch_size, sim_seed,
+                                            'vscd' if decoder_name is None else decoder_name)
+        try:
+            def run_frames(Eb_No, num_frames):
+                if num_workers is not None:
+                    return parallel_sim.run_simulation(Eb_No, num_frames, np.inf, num_frames)
+                return self.run_simulation(Eb_No, num_frames, np.inf, num_frames, batch_size, decoder_name)
+            adaptive_counts = self.run_adaptive_simulation(Eb_No_vec, run_frames, ci_width, confidence, chunk_size, max_iter,
+                                                           max_iter * len(Eb_No_vec) if total_budget is None else total_budget)
+        finally:
+            if num_workers is not None:
+                parallel_sim.close()
+
+        for i, counts in enumerate(adaptive_counts):
+            frame_error_count, bit_error_count, num_blocks = counts
+            frame_error_rates[i] = frame_error_count / num_blocks
+            bit_error_rates[i] = bit_error_count / (self.get_message_length() * num_blocks)
+            fer_intervals[i] = fer_confidence_interval(frame_error_count, num_blocks, confidence)
+            frames[i] = num_blocks
+            note = "FER interval: " + str([round(float(bound), 5) for bound in fer_intervals[i]]) + "  at " + str(confidence) + " confidence"
+            self.report_snr(i, Eb_No_vec, frame_error_rates[i], bit_error_rates[i], counts, [note])
+
+        results = {
+            'confidence': confidence,
+            'FER_lower': fer_intervals[:, 0].tolist(),
+            'FER_upper': fer_intervals[:, 1].tolist(),
+            'frames': frames.tolist(),
+        }
+        self.save_results(save_to, Eb_No_vec, frame_error_rates, bit_error_rates, results)
+
+    def simulate_importance(self, save_to, Eb_No_vec, shift=1.0, design_SNR=None, max_iter=100000, min_iterations=1000, min_errors=30, sim_seed=1729, manual_const_flag=True, batch_size=256, decoder_name=None):
+        """
+        Monte-carlo simulation of the performance of this polar code with importance sampling (see
+        `run_importance_simulation`), for SNRs with a very low FER. The FER and BER are the weighted estimates, and
+        they are saved in a JSON file using :func:`save_as_json`, together with their variances and the effective
+        number of frame errors of each SNR. The early stopping conditions are the same as `simulate`, using the
+        effective number of frame errors.
+
+        Parameters
+        ----------
+        save_to: string
+            directory and filename to save JSON file to (excluding extension)
+        Eb_No_vec: ndarray<float>
+            the range of SNR values to simulate
+        shift: float
+            the mean shift of the noise towards the dominant error events, as a fraction of the distance to the
+            decision boundary
+        design_SNR: float
+            the construction design SNR, E_b/N_o
+        max_iter: int
+            maximum number of iterations per SNR
+        min_iterations: int
+            the minimum number of iterations before early stopping is allowed per SNR
+        min_errors: int
+            the minimum effective number of frame errors before early stopping is allowed per SNR
+        sim_seed: int
+            pseudo-random generator seed, default is 1729 ('twister' on MATLAB)
+        manual_const_flag: bool
+            a flag that decides if construction should be done before simulating, as in `simulate`
+        batch_size: int
+            the number of frames per batch
+        decoder_name: string
+            the name of a batch decoder (see `BatchDecode`). Default is 'vscd'.
+
+        """
+
+        if decoder_name is not None and decoder_name.endswith('scl'):
+            raise ValueError("The 'scl' decoder has no batch decoder, so it cannot be simulated with importance sampling")
+
+        # initialise simulation
+        self.start_simulation(design_SNR, sim_seed, manual_const_flag)
+        frame_error_rates = np.zeros(len(Eb_No_vec))
+        bit_error_rates = np.zeros(len(Eb_No_vec))
+        fer_variances = np.zeros(len(Eb_No_vec))
+        ber_variances = np.zeros(len(Eb_No_vec))
+        effective_errors = np.zeros(len(Eb_No_vec))
+
+        for i in range(len(Eb_No_vec)):
+            # run simulation for the current SNR
+            counts = self.run_importance_simulation(Eb_No_vec[i], max_iter, min_errors, min_iterations, batch_size, shift, decoder_name)
+            frame_error_rates[i], bit_error_rates[i], fer_variances[i], ber_variances[i], effective_errors[i] = counts[3:]
+            note = ("FER std: " + str(float(np.sqrt(fer_variances[i]))) + "  BER std: " + str(float(np.sqrt(ber_variances[i]))) +
+                    "  Effective Frame Errors: " + str(round(float(effective_errors[i]), 1)))
+            self.report_snr(i, Eb_No_vec, frame_error_rates[i], bit_error_rates[i], counts[:3], [note])
+
+            # early stopping condition
+            if effective_errors[i] < min_errors:
+                break
+
+        results = {
+            'importance_shift': shift,
+            'FER_variance': fer_variances.tolist(),
+            'BER_variance': ber_variances.tolist(),
+            'effective_frame_errors': effective_errors.tolist(),
+        }
+        self.save_results(save_to, Eb_No_vec, frame_error_rates, bit_error_rates, results)
+
     def plot_helper(self, new_plot, sim_filenames, dir, plot_title = 'Polar Code Performance'):
         # plot the FER and BER from file list
         new_plot.cla()
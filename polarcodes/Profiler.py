@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+"""
+Built-in instrumentation of the simulations. A profiler is enabled by setting it as ``profiler`` in a `PolarCode`.
+`PolarCode.run_simulation` then adds the wall time and the number of frames of each stage (message source, encoder,
+channel, decoder and error counting) to the cumulative counters of the profiler, and the summary of the counters is
+saved by `PolarCode.save_as_json`. The profiler can also count the node updates of `SCD` at each depth of the decoding
+tree, and call functions with every timing, e.g. to collect the times in another tool.
+Without a profiler, the cost of the instrumentation is one comparison with None per stage.
+"""
+
+import time
+import numpy as np
+
+class Profiler:
+    def __init__(self, count_levels=False, callbacks=()):
+        """
+        Parameters
+        ----------
+        count_levels: bool
+            count the node updates of `SCD.update_llrs` and `SCD.update_bits` at each depth of the decoding tree.
+            Only the frame-by-frame `SCD` is counted, i.e. `Decode` with 'scd', the 'exact' f-function and the numpy
+            backend. The batch, compiled, `VSCD` and importance sampling decoders are not counted.
+        callbacks: iterable
+            functions that are called as ``callback(stage, seconds, num_frames)`` with every timing
+
+        """
+
+        self.count_levels = count_levels
+        self.callbacks = list(callbacks)
+        self.reset()
+
+    def reset(self):
+        """
+        Set all of the counters to zero.
+        """
+
+        self.stage_seconds = {}
+        self.stage_frames = {}
+        self.level_counts = {}
+        self.last_time = time.perf_counter()
+
+    def start(self):
+        """
+        Start timing the next stage.
+        """
+
+        self.last_time = time.perf_counter()
+
+    def lap(self, stage, num_frames=1):
+        """
+        Add the time since the last call of `start` or `lap` to a stage, and start timing the next stage.
+
+        Parameters
+        ----------
+        stage: string
+            the name of the stage
+        num_frames: int
+            the number of frames processed by the stage
+
+        """
+
+        now = time.perf_counter()
+        self.add(stage, now - self.last_time, num_frames)
+        self.last_time = now
+
+    def add(self, stage, seconds, num_frames=1):
+        """
+        Add a timing to the counters of a stage, and call the callbacks with it.
+        """
+
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0) + seconds
+        self.stage_frames[stage] = self.stage_frames.get(stage, 0) + num_frames
+        for callback in self.callbacks:
+            callback(stage, seconds, num_frames)
+
+    def get_level_counts(self, n):
+        """
+        The per-depth counters of `SCD` for a tree of depth n, or None if they are not counted.
+
+        Returns
+        ----------
+        dict
+            an ndarray<int> of length n + 1 for each of 'update_llrs' and 'update_bits'
+
+        """
+
+        if not self.count_levels:
+            return None
+        counts = self.level_counts.get(n)
+        if counts is None:
+            counts = {'update_llrs': np.zeros(n + 1, dtype=np.int64), 'update_bits': np.zeros(n + 1, dtype=np.int64)}
+            self.level_counts[n] = counts
+        return counts
+
+    def summary(self):
+        """
+        Returns
+        ----------
+        dict
+            for each stage, the total time in seconds, the number of frames and the time per frame in microseconds,
+            and the node updates of `SCD` at each depth for each tree depth n (only if any were counted)
+
+        """
+
+        stages = {}
+        for stage, seconds in self.stage_seconds.items():
+            frames = self.stage_frames[stage]
+            stages[stage] = {
+                'seconds': seconds,
+                'frames': frames,
+                'us_per_frame': 1e6 * seconds / frames if frames > 0 else 0,
+            }
+        summary = {'stages': stages, 'total_seconds': sum(self.stage_seconds.values())}
+        if self.level_counts:
+            summary['levels'] = {str(n): {name: c.tolist() for name, c in counts.items()}
+                                 for n, counts in self.level_counts.items()}
+        return summary
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+"""
+A fixed-point Successive Cancellation Decoder, as in a hardware decoder. The channel likelihoods are quantised to
+signed integers of ``llr_bits`` bits with ``frac_bits`` fractional bits, and the decoding tree is stored in int8 (up to
+8 bits) or int16 (up to 16 bits) buffers. The top branch LLRs use the min-sum f-function, and the bottom branch LLRs are
+saturated to the largest LLR magnitude. Infinite likelihoods from shortening saturate to the largest LLR. Unlike the
+infinite LLRs of the floating-point decoders, a saturated LLR is not kept saturated by the bottom branches, e.g. the
+difference of the largest LLR and x is the largest LLR minus x rather than infinity.
+"""
+
+import numpy as np
+from polarcodes.VSCD import VSCD
+
+class QuantisedSCD(VSCD):
+    def __init__(self, myPC, llr_bits=None, frac_bits=None):
+        """
+        Parameters
+        ----------
+        myPC: `PolarCode`
+            a polar code object created using the :class:`PolarCode` class
+        llr_bits: int
+            the number of bits of each LLR, including the sign bit, from 2 to 16 (default is from
+            ``llr_quantisation`` in ``myPC``)
+        frac_bits: int
+            the number of fractional bits of each LLR, i.e. the LLRs are integer multiples of 2^-frac_bits
+            (default is from ``llr_quantisation`` in ``myPC``)
+
+        """
+
+        VSCD.__init__(self, myPC, 'min_sum', scalar_size=0)
+        self.llr_bits = myPC.llr_quantisation[0] if llr_bits is None else llr_bits
+        self.frac_bits = myPC.llr_quantisation[1] if frac_bits is None else frac_bits
+        if not 2 <= self.llr_bits <= 16:
+            raise ValueError("The quantised LLRs must have from 2 to 16 bits.")
+
+        # the LLRs are symmetric about zero, so the most negative integer is not used
+        self.dtype = np.int8 if self.llr_bits <= 8 else np.int16
+        self.wide_dtype = np.int16 if self.llr_bits <= 8 else np.int32
+        self.max_llr = 2 ** (self.llr_bits - 1) - 1
+        self.upper_llrs = self.upper_llrs_quantised
+        self.lower_llrs = self.lower_llrs_quantised
+
+    def quantise(self, llrs):
+        """
+        Quantise likelihoods to the fixed-point format of the decoder, with saturation.
+
+        Parameters
+        ----------
+        llrs: ndarray<float>
+            the likelihoods, which may be infinite for shortened bits
+
+        Returns
+        ----------
+        ndarray<int8>, ndarray<int16>
+            the quantised likelihoods, as multiples of 2^-frac_bits
+
+        """
+
+        scaled = np.clip(np.rint(np.ldexp(llrs, self.frac_bits)), -self.max_llr, self.max_llr)
+        return scaled.astype(self.dtype)
+
+    def allocate(self, batch_shape):
+        if len(self.L) > 0 and self.L[0].shape[:-1] == batch_shape:
+            return
+        N = self.myPC.N
+        n = self.myPC.n
+        self.L = [np.empty(batch_shape + (N >> d,), dtype=self.dtype) for d in range(n + 1)]
+        self.B = [np.zeros(batch_shape + (N >> d,), dtype=np.uint8) for d in range(n + 1)]
+
+    def decode_batch(self, llrs):
+        """
+        Decode a batch of frames, after quantising the likelihoods with `quantise`.
+
+        Parameters
+        ----------
+        llrs: ndarray<float>
+            a (B, N) array of channel likelihoods, one frame per row. A single frame of shape (N,) is also accepted.
+
+        Returns
+        ----------
+        ndarray<uint8>
+            a (B, N) array of the decoded bits, in the same order as the output of `SCD.decode`
+
+        """
+
+        return VSCD.decode_batch(self, self.quantise(llrs))
+
+    def upper_llrs_quantised(self, l1, l2):
+        # min-sum f-function: the magnitude is at most the magnitudes of l1 and l2, so it cannot overflow
+        llr = np.minimum(np.abs(l1), np.abs(l2))
+        return np.where((l1 ^ l2) < 0, -llr, llr)
+
+    def lower_llrs_quantised(self, l1, l2, b):
+        # the sum or difference is found in a wider integer type, then saturated
+        llr = np.where(b == 0, np.add(l1, l2, dtype=self.wide_dtype), np.subtract(l1, l2, dtype=self.wide_dtype))
+        return np.clip(llr, -self.max_llr, self.max_llr)
@@ -4,67 +4,121 @@ from polarcodes.decoder_utils import *
 
 class SCD:
     def __init__(self, myPC):
+        """
+        A Successive Cancellation Decoder that is kept between frames, e.g. by `PolarCode.get_scd`.
+        The LLRs and the bits of the decoding tree are stored in the 2N-1 layout, i.e. one node per depth of the tree,
+        from the N channel LLRs at depth 0 to the leaf at depth n. Every entry is written before it is read, so the
+        workspace is allocated once and it is not reset between frames.
+
+        Parameters
+        ----------
+        myPC: `PolarCode`
+            a polar code object created using the :class:`PolarCode` class
+
+        """
+
         self.myPC = myPC
-        self.L = np.full((self.myPC.N, self.myPC.n + 1), np.nan, dtype=np.float64)
-        self.B = np.full((self.myPC.N, self.myPC.n + 1), np.nan)
-        self.L[:, 0] = self.myPC.likelihoods
+        self.schedule = self.myPC.get_schedule()
+        N = self.myPC.N
+        self.offsets = [2 * N - 2 * (N >> d) for d in range(self.myPC.n + 1)]   # the start of each depth
+        self.L = np.empty(2 * N - 1, dtype=np.float64)
+        self.B = np.zeros(2 * N - 1, dtype=np.uint8)
+        self.level_counts = None
 
-    def decode(self):
+    def decode(self, llrs=None, out=None):
         """
-        Successive Cancellation Decoder. The decoded message is set to ``message_received`` in ``myPC``.
+        Successive Cancellation Decoder.
         The decoder will use the frozen set as defined by ``frozen`` in ``myPC``.
+        The tree is decoded in natural order over the bit-reversed channel, which gives the same decisions as decoding
+        the bit-reversed leaves in natural order.
         Depends on `update_llrs` and `update_bits`.
 
         Parameters
         ----------
-        y: ndarray<float>
-            a vector of likelihoods at the channel output
+        llrs: ndarray<float>
+            a vector of likelihoods at the channel output (default is ``likelihoods`` in ``myPC``)
+        out: ndarray<int>
+            a vector of length N for the decoded bits, which is reused instead of allocating a new vector
+
+        Returns
+        ----------
+        ndarray<int>
+            the decoded bits
 
         -------------
         **References:**
 
         *  Vangala, H., Viterbo, & Yi Hong. (2014). Permuted successive cancellation decoder for polar codes. 2014 International Symposium on Information Theory and Its Applications, 438–442. IEICE.
 
+        *  Leroux, C., Raymond, A. J., Sarkis, G., & Gross, W. J. (2013). A Semi-Parallel Successive-Cancellation Decoder for Polar Codes. IEEE Transactions on Signal Processing, 61(2), 289–299.
+
         """
 
-        # decode bits in natural order
-        for l in [bit_reversed(i, self.myPC.n) for i in range(self.myPC.N)]:
-            # evaluate tree of LLRs for root index i
-            self.update_llrs(l)
+        N = self.myPC.N
+        leaf = 2 * N - 2
+        order = self.schedule.order
+        frozen = self.schedule.decoding_frozen
+        llrs = self.myPC.likelihoods if llrs is None else llrs
+        u_hat = np.zeros(N, dtype=int) if out is None else out
+        np.take(llrs, order, out=self.L[:N])
+        profiler = self.myPC.profiler
+        self.level_counts = None if profiler is None else profiler.get_level_counts(self.myPC.n)
+
+        for i in range(N):
+            # evaluate the LLRs of every new node on the path to leaf i
+            self.update_llrs(i)
 
             # make hard decision at output
-            if l in self.myPC.frozen:
-                self.B[l, self.myPC.n] = 0
-            else:
-                self.B[l, self.myPC.n] = hard_decision(self.L[l, self.myPC.n])
+            bit = 0 if frozen[i] else hard_decision(self.L[leaf])
+            u_hat[order[i]] = bit
 
             # propagate the hard decision just made
-            self.update_bits(l)
-        return self.B[:, self.myPC.n].astype(int)
-
-    def update_llrs(self, l):
-        for s in range(self.myPC.n - active_llr_level(l, self.myPC.n), self.myPC.n):
-            block_size = int(2 ** (s + 1))
-            branch_size = int(block_size / 2)
-            for j in range(l, self.myPC.N, block_size):
-                if j % block_size < branch_size:  # upper branch
-                    top_llr = self.L[j, s]
-                    btm_llr = self.L[j + branch_size, s]
-                    self.L[j, s + 1] = upper_llr(top_llr, btm_llr)
-                else:  # lower branch
-                    btm_llr = self.L[j, s]
-                    top_llr = self.L[j - branch_size, s]
-                    top_bit = self.B[j - branch_size, s + 1]
-                    self.L[j, s + 1] = lower_llr(btm_llr, top_llr, top_bit)
-
-    def update_bits(self, l):
-        if l < self.myPC.N / 2:
-            return
-
-        for s in range(self.myPC.n, self.myPC.n - active_bit_level(l, self.myPC.n), -1):
-            block_size = int(2 ** s)
-            branch_size = int(block_size / 2)
-            for j in range(l, -1, -block_size):
-                if j % block_size >= branch_size:  # lower branch
-                    self.B[j - branch_size, s - 1] = int(self.B[j, s]) ^ int(self.B[j - branch_size, s])
-                    self.B[j, s - 1] = self.B[j, s]
\ No newline at end of file
+            self.B[leaf] = bit
+            self.update_bits(i)
+        return u_hat
+
+    def update_llrs(self, i):
+        N = self.myPC.N
+        L = self.L
+        B = self.B
+        offsets = self.offsets
+        d = self.schedule.llr_depths[i]
+        if self.level_counts is not None:  # one node is updated at each depth from d to n
+            self.level_counts['update_llrs'][d:] += 1
+        if i > 0:  # lower branch at the depth of the lowest set bit of i
+            h = N >> d
+            parent = offsets[d - 1]
+            node = offsets[d]
+            for k in range(h):
+                L[node + k] = lower_llr(L[parent + k + h], L[parent + k], B[parent + k])
+            d += 1
+        for s in range(d, self.myPC.n + 1):  # upper branches down to the leaf
+            h = N >> s
+            parent = offsets[s - 1]
+            node = offsets[s]
+            for k in range(h):
+                L[node + k] = upper_llr(L[parent + k], L[parent + k + h])
+
+    def update_bits(self, i):
+        # the bits of a completed node are written to its half of the parent node
+        N = self.myPC.N
+        B = self.B
+        offsets = self.offsets
+        counts = None if self.level_counts is None else self.level_counts['update_bits']
+        d = self.myPC.n
+        while d > 0:
+            h = N >> d
+            parent = offsets[d - 1]
+            node = offsets[d]
+            if counts is not None:
+                counts[d] += 1
+            if i & 1:  # lower branch: the parent node is completed
+                for k in range(h):
+                    B[parent + k + h] = B[node + k]
+                    B[parent + k] ^= B[node + k]
+                d -= 1
+                i >>= 1
+            else:  # upper branch: keep the bits for the lower branch
+                for k in range(h):
+                    B[parent + k] = B[node + k]
+                break
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+"""
+A Successive Cancellation List (SCL) decoder. It uses the same tree as `VSCD`, and the f/g kernels in `decoder_utils`
+are vectorised across the active decoding paths.
+
+Each depth of the tree has one LLR buffer and one bit buffer per list entry. A path refers to a buffer at each depth
+through a pointer table, and a copied path shares all of its buffers with the path it was copied from. A buffer is
+only copied when a path writes to a buffer that it shares (lazy copying), so the memory is O(L.N). The decision of
+each path at each leaf is stored with the index of its parent path, and the decoded bits are traced back once at the
+end, so a path is copied in O(1) at each leaf rather than with all of its N decisions.
+"""
+
+import numpy as np
+from polarcodes.utils import *
+from polarcodes.decoder_utils import *
+from polarcodes.backends import get_backend
+
+class SCL:
+    def __init__(self, myPC, list_size=4, f_name='exact', backend='numpy'):
+        """
+        Parameters
+        ----------
+        myPC: `PolarCode`
+            a polar code object created using the :class:`PolarCode` class
+        list_size: int
+            the maximum number of decoding paths, L
+        f_name: string
+            the f-function used for the top branch LLRs. Options: {'exact', 'min_sum', 'offset_min_sum',
+            'normalised_min_sum'} (see `decoder_utils.f_functions`).
+        backend: string
+            the kernel backend of the f/g functions (see `backends.get_backend`)
+
+        """
+
+        self.myPC = myPC
+        self.list_size = list_size
+        kernels = get_backend(backend)
+        self.upper_llrs = kernels['f_functions'][f_name][0]
+        self.lower_llrs = kernels['lower_llrs']
+        N = self.myPC.N
+        n = self.myPC.n
+
+        schedule = self.myPC.get_schedule()
+        self.order = schedule.order
+        self.frozen_mask = schedule.decoding_frozen
+        self.llr_depths = schedule.llr_depths
+
+        # L buffers per depth. The channel LLRs are the same in every buffer at depth 0, so they are never copied.
+        self.P = [np.empty((list_size, N >> d), dtype=np.float64) for d in range(n + 1)]
+        self.C = [np.zeros((list_size, N >> d), dtype=np.uint8) for d in range(n)]
+
+    def decode(self):
+        """
+        Successive Cancellation List decoder. The decoder will use the frozen set as defined by ``frozen`` in ``myPC``,
+        and the likelihoods as defined by ``likelihoods`` in ``myPC``.
+
+        Returns
+        ----------
+        ndarray<int>, ndarray<float>
+            the decoded bits of each surviving path as rows, in the same order as the output of `SCD.decode`,
+            and their path metrics. The rows are sorted from the most likely path to the least likely path.
+
+        -------------
+        **References:**
+
+        *  Tal, I., & Vardy, A. (2015). List Decoding of Polar Codes. IEEE Transactions on Information Theory, 61(5), 2213–2226.
+
+        *  Balatsoukas-Stimming, A., Parizi, M. B., & Burg, A. (2015). LLR-Based Successive Cancellation List Decoding of Polar Codes. IEEE Transactions on Signal Processing, 63(19), 5165–5179.
+
+        """
+
+        N = self.myPC.N
+        n = self.myPC.n
+        self.P[0][:] = self.myPC.likelihoods[self.order]
+
+        # a single path to begin with, which uses buffer 0 at every depth
+        self.A = 1
+        self.ptr = np.zeros((self.list_size, n + 1), dtype=int)
+        self.metrics = np.zeros(self.list_size)
+        self.decisions = np.zeros((N, self.list_size), dtype=np.uint8)
+        self.parents = np.zeros((N, self.list_size), dtype=int)
+
+        for i in range(N):
+            self.update_llrs(i)
+            self.update_paths(i)
+            self.update_bits(i)
+
+        # trace the decisions of each surviving path back through its parent paths
+        best = np.argsort(self.metrics[:self.A], kind='mergesort')
+        u_hat = np.empty((len(best), N), dtype=np.uint8)
+        paths = best
+        for i in range(N - 1, -1, -1):
+            u_hat[:, i] = self.decisions[i, paths]
+            paths = self.parents[i, paths]
+        return u_hat[:, self.order].astype(int), self.metrics[best]
+
+    def claim_buffers(self, d, copy_flag):
+        """
+        Give every active path its own buffer at depth ``d`` before it is written to.
+        A path that shares a buffer is moved to a free buffer, and the buffer contents are copied if ``copy_flag`` is True.
+        """
+
+        ptr = self.ptr[:self.A, d]
+        first = np.zeros(self.A, dtype=bool)
+        first[np.unique(ptr, return_index=True)[1]] = True
+        if np.all(first):
+            return
+        shared = np.flatnonzero(~first)
+        free = np.setdiff1d(np.arange(self.list_size), ptr)[:len(shared)]
+        if copy_flag:
+            if d > 0:
+                self.P[d][free] = self.P[d][ptr[shared]]
+            self.C[d][free] = self.C[d][ptr[shared]]
+        self.ptr[shared, d] = free
+
+    def update_llrs(self, i):
+        N = self.myPC.N
+        n = self.myPC.n
+        P = self.P
+        ptr = self.ptr[:self.A]
+        d = self.llr_depths[i]
+        if i > 0:  # lower branch at the depth of the lowest set bit of i
+            h = N >> d
+            self.claim_buffers(d, False)
+            parent = P[d - 1][ptr[:, d - 1]]
+            bits = self.C[d - 1][ptr[:, d - 1], :h]
+            P[d][ptr[:, d]] = self.lower_llrs(parent[:, h:], parent[:, :h], bits)
+            d += 1
+        for s in range(d, n + 1):  # upper branches down to the leaf
+            h = N >> s
+            self.claim_buffers(s, False)
+            parent = P[s - 1][ptr[:, s - 1]]
+            P[s][ptr[:, s]] = self.upper_llrs(parent[:, :h], parent[:, h:])
+
+    def update_paths(self, i):
+        # path metrics for both decisions of each path, using the exact penalty ln(1 + exp(-(1 - 2u) * LLR))
+        n = self.myPC.n
+        A = self.A
+        llrs = self.P[n][self.ptr[:A, n], 0]
+        if self.frozen_mask[i]:
+            self.metrics[:A] += np.logaddexp(0, -llrs)
+            self.decisions[i, :A] = 0
+            self.parents[i, :A] = np.arange(A)
+            return
+
+        candidates = np.concatenate((self.metrics[:A] + np.logaddexp(0, -llrs),
+                                     self.metrics[:A] + np.logaddexp(0, llrs)))
+        survivors = np.sort(np.argsort(candidates, kind='mergesort')[:self.list_size])
+        parents = survivors % A
+
+        # the surviving paths share the buffers of their parent paths
+        self.A = len(survivors)
+        self.ptr[:self.A] = self.ptr[parents]
+        self.parents[i, :self.A] = parents
+        self.decisions[i, :self.A] = survivors >= A
+        self.metrics[:self.A] = candidates[survivors]
+
+    def update_bits(self, i):
+        # the bits of a completed node are written to its half of the parent node
+        if i == self.myPC.N - 1:
+            return
+        N = self.myPC.N
+        C = self.C
+        ptr = self.ptr[:self.A]
+        bits = self.decisions[i, :self.A, np.newaxis]
+        d = self.myPC.n
+        while d > 0:
+            h = N >> d
+            self.claim_buffers(d - 1, True)
+            parent = ptr[:, d - 1]
+            if i & 1:  # lower branch: the parent node is completed
+                C[d - 1][parent, h:] = bits
+                C[d - 1][parent, :h] ^= bits
+                bits = C[d - 1][parent]
+                d -= 1
+                i >>= 1
+            else:  # upper branch: keep the bits for the lower branch
+                C[d - 1][parent, :h] = bits
+                break
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+"""
+A decoding schedule for a polar code. Everything that the decoders need to know about the order of the decoding tree
+depends only on the block length and the frozen set, so it is computed once and cached by `PolarCode.get_schedule`.
+The cached schedule is dropped whenever the code is changed by `PolarCode.initialise_code`, `Construct` or `Shorten`.
+"""
+
+import numpy as np
+from polarcodes.utils import *
+from polarcodes.decoder_utils import *
+
+class Schedule:
+    """
+    Attributes
+    ----------
+    order: ndarray<int>
+        the leaf decoded at each step of the decoders, i.e. the bit-reversal permutation.
+        The decoders decode the bit-reversed channel in natural order, so ``order`` also maps
+        between their decoding order and the natural order.
+    frozen_mask: ndarray<bool>
+        True for a frozen index, in natural order
+    decoding_frozen: ndarray<bool>
+        True for a frozen leaf, in decoding order
+    llr_depths: ndarray<int>
+        the first depth of the LLR updates of the decoders for each step, where depth 0 is the channel
+
+    """
+
+    def __init__(self, N, frozen):
+        """
+        Parameters
+        ----------
+        N: int
+            the mothercode block length
+        frozen: ndarray<int>
+            the frozen bit indices
+
+        """
+
+        self.N = N
+        self.n = int(np.log2(N))
+        self.frozen = np.array(frozen, dtype=int)
+        n = self.n
+
+        self.order = bit_reversed(np.arange(N), n)
+        self.frozen_mask = np.zeros(N, dtype=bool)
+        self.frozen_mask[self.frozen] = True
+        self.decoding_frozen = self.frozen_mask[self.order]
+
+        leaves = np.arange(1, N)
+        self.llr_depths = np.append(1, n - hamming_wt((leaves & -leaves) - 1, n))  # n minus the trailing zeros
+        self.instructions = {}
+
+    def matches(self, N, frozen):
+        """
+        Returns
+        ----------
+        bool
+            True if this schedule is for block length ``N`` and the frozen set ``frozen``
+
+        """
+
+        return self.N == N and np.array_equal(self.frozen, np.array(frozen, dtype=int))
+
+    def node_type(self, d, j, special_nodes):
+        """
+        Find the type of the node ``j`` at depth ``d`` of the decoding tree from the frozen bits of its leaves.
+
+        Returns
+        ----------
+        string
+            'rate0', 'rate1', 'rep', 'spc', or '' for a node that has to be split into its two branches
+
+        """
+
+        size = self.N >> d
+        frozen = self.decoding_frozen[j * size:(j + 1) * size]
+        if np.all(frozen):
+            node_type = 'rate0'
+        elif not np.any(frozen):
+            node_type = 'rate1'
+        elif np.all(frozen[:-1]):
+            node_type = 'rep'
+        elif frozen[0] and not np.any(frozen[1:]):
+            node_type = 'spc'
+        else:
+            return ''
+        return node_type if node_type in special_nodes or size == 1 else ''
+
+    def get_instructions(self, special_nodes):
+        """
+        The instructions for decoding the whole tree with the special nodes in ``special_nodes`` decoded at their root,
+        as used by `FastSSC`. The instructions are cached for each tuple of special nodes.
+
+        Parameters
+        ----------
+        special_nodes: tuple
+            the node types that are decoded in closed form, from {'rate0', 'rate1', 'rep', 'spc'}
+
+        Returns
+        ----------
+        list<tuple>
+            (operation, depth, node index) for each step of the decoder
+
+        """
+
+        if special_nodes not in self.instructions:
+            instructions = []
+            self.compile_node(0, 0, special_nodes, instructions)
+            self.instructions[special_nodes] = instructions
+        return self.instructions[special_nodes]
+
+    def compile_node(self, d, j, special_nodes, instructions):
+        # add the instructions for node j at depth d, in the same order as successive cancellation
+        node_type = self.node_type(d, j, special_nodes)
+        if node_type != '':
+            instructions.append((node_type, d, j))
+            return
+        instructions.append(('f', d + 1, 2 * j))
+        self.compile_node(d + 1, 2 * j, special_nodes, instructions)
+        instructions.append(('g', d + 1, 2 * j + 1))
+        self.compile_node(d + 1, 2 * j + 1, special_nodes, instructions)
+        instructions.append(('combine', d, j))
@@ -10,7 +10,7 @@ from polarcodes.utils import *
 from polarcodes.Construct import Construct
 
 class Shorten(Construct):
-    def __init__(self, myPC, design_SNR, manual=False):
+    def __init__(self, myPC, design_SNR, manual=False, backend='numpy'):
         """
 
         Parameters
@@ -21,10 +21,12 @@ class Shorten(Construct):
             the design SNR in decibels
         manual: bool
             suppress the constructor init
+        backend: string
+            the kernel backend of the construction (see `backends.get_backend`), e.g. 'numba'
 
         """
 
-        super().__init__(myPC, design_SNR, True)
+        super().__init__(myPC, design_SNR, True, backend)
         if manual:
             return
         else:
@@ -56,6 +58,7 @@ class Shorten(Construct):
         myPC.frozen = self.frozen_from_pattern(myPC)
         myPC.frozen_lookup = myPC.get_lut(myPC.frozen)
         myPC.FERestimate = self.FER_estimate(myPC.frozen, myPC.z)
+        myPC.schedule = None
 
     def shortened_pcc(self, myPC, design_SNR):
         """
@@ -71,16 +74,7 @@ class Shorten(Construct):
 
         """
 
-        # select the construction method
-        design_SNR_normalised = myPC.get_normalised_SNR(design_SNR)
-        if myPC.construction_type == 'bb':
-            z0 = np.array([-design_SNR_normalised] * myPC.N)
-            z0[myPC.punct_set] = -np.inf
-            myPC.reliabilities, myPC.frozen, myPC.FERestimate = self.general_pcc(myPC, z0)
-        elif myPC.construction_type == 'ga':
-            z0 = np.array([4 * design_SNR_normalised] * myPC.N)
-            z0[myPC.punct_set] = np.inf
-            myPC.reliabilities, myPC.frozen, myPC.FERestimate = self.general_ga(myPC, z0)
+        self.construct_reliabilities(myPC, design_SNR, myPC.punct_set)
 
     def wls_pattern(self, myPC):
         """
@@ -127,7 +121,7 @@ class Shorten(Construct):
 
         """
         punct_set_last = self.wls_pattern(myPC)
-        punct_set = np.array([bit_reversed(i, myPC.n) for i in punct_set_last])
+        punct_set = bit_reversed(punct_set_last, myPC.n)
         return punct_set
 
     def frozen_from_pattern(self, myPC):
@@ -146,12 +140,10 @@ class Shorten(Construct):
 
         """
 
-        R_m = []
-        for i in range(myPC.N):    # add elements from R not in punct_set to R_m
-            if myPC.reliabilities[i] not in myPC.source_set:
-                R_m.append(myPC.reliabilities[i])
+        source_set = np.asarray(myPC.source_set, dtype=int)
+        R_m = subtract_set(myPC.reliabilities, source_set)    # elements from R not in source_set
         t = myPC.M - myPC.K   # number of frozen bits left to select
-        frozen = np.array(np.append(np.array(R_m[:t]), myPC.source_set))   # first t bits of R_m, then append S
+        frozen = np.append(R_m[:t], source_set)   # first t bits of R_m, then append S
         return frozen
 
     def perm(self, myPC):
@@ -172,7 +164,7 @@ class Shorten(Construct):
         """
 
         punct_set_last = self.wls_pattern(myPC)
-        punct_set = np.array(bit_perm(punct_set_last, myPC.perm, myPC.n))  # specify perm before construction
+        punct_set = bit_perm(punct_set_last, myPC.perm, myPC.n)  # specify perm before construction
         return punct_set
 
     def wang_liu(self, myPC):
@@ -212,6 +204,6 @@ class Shorten(Construct):
 
         num_bits = myPC.n
         s = myPC.N - myPC.M  # number bits to shorten
-        reversed_indices = np.array([bit_reversed(i, num_bits) for i in myPC.reliabilities])
+        reversed_indices = bit_reversed(myPC.reliabilities, num_bits)
         punct_set = np.array(reversed_indices[-s:])  # last s bits of reversed_indices
         return punct_set
\ No newline at end of file
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+
+"""
+A vectorised Successive Cancellation Decoder (SCD). Each update of the decoding tree is done as a NumPy slice
+operation over a whole stage, instead of one scalar `upper_llr`/`lower_llr` call per tree node as in `SCD`.
+The same operations are vectorised across a batch of frames by `decode_batch`.
+"""
+
+import numpy as np
+from polarcodes.utils import *
+from polarcodes.decoder_utils import *
+from polarcodes.backends import get_backend, f_indices
+
+class VSCD:
+    def __init__(self, myPC, f_name='exact', scalar_size=8, backend='numpy'):
+        """
+        Parameters
+        ----------
+        myPC: `PolarCode`
+            a polar code object created using the :class:`PolarCode` class
+        f_name: string
+            the f-function used for the top branch LLRs. Options: {'exact', 'min_sum', 'offset_min_sum',
+            'normalised_min_sum'} (see `decoder_utils.f_functions`).
+            The 'exact' f-function gives identical decisions to `SCD`.
+        scalar_size: int
+            nodes with at most this many LLRs are updated one element at a time, since the overhead
+            of a NumPy call is larger than the work for small nodes. Only used for single frames.
+        backend: string
+            the kernel backend (see `backends.get_backend`). The whole tree is decoded by the compiled
+            'sc_decode' kernel of the backend if it has one.
+
+        """
+
+        self.myPC = myPC
+        kernels = get_backend(backend)
+        self.upper_llrs, self.upper_llr = kernels['f_functions'][f_name]
+        self.lower_llrs = kernels['lower_llrs']
+        self.sc_decode = kernels['sc_decode']
+        self.f_index = f_indices[f_name]
+        self.scalar_size = scalar_size
+
+        # the tree is decoded in natural order over the bit-reversed channel, which is equivalent to
+        # decoding the bit-reversed leaves of the tree in `SCD`
+        schedule = self.myPC.get_schedule()
+        self.order = schedule.order
+        self.frozen_mask = schedule.decoding_frozen
+        self.llr_depths = schedule.llr_depths
+        self.L = []
+        self.B = []
+
+    def allocate(self, batch_shape):
+        """
+        Allocate one contiguous LLR buffer and one bit buffer per depth of the tree.
+        The buffers are kept between calls with the same batch shape.
+
+        Parameters
+        ----------
+        batch_shape: tuple
+            the shape of the batch axes, i.e. () for a single frame and (B,) for a batch of B frames
+
+        """
+
+        if len(self.L) > 0 and self.L[0].shape[:-1] == batch_shape:
+            return
+        N = self.myPC.N
+        n = self.myPC.n
+        self.L = [np.empty(batch_shape + (N >> d,), dtype=np.float64) for d in range(n + 1)]
+        self.B = [np.zeros(batch_shape + (N >> d,), dtype=np.uint8) for d in range(n + 1)]
+
+    def decode(self):
+        """
+        Vectorised Successive Cancellation Decoder.
+        The decoder will use the frozen set as defined by ``frozen`` in ``myPC``, and the likelihoods
+        as defined by ``likelihoods`` in ``myPC``.
+
+        Returns
+        ----------
+        ndarray<int>
+            the decoded bits, in the same order as the output of `SCD.decode`
+
+        -------------
+        **References:**
+
+        *  Leroux, C., Raymond, A. J., Sarkis, G., & Gross, W. J. (2013). A Semi-Parallel Successive-Cancellation Decoder for Polar Codes. IEEE Transactions on Signal Processing, 61(2), 289–299.
+
+        """
+
+        return self.decode_batch(self.myPC.likelihoods).astype(int)
+
+    def decode_batch(self, llrs):
+        """
+        Decode a batch of frames at once. Every operation on the decoding tree is vectorised across the batch.
+
+        Parameters
+        ----------
+        llrs: ndarray<float>
+            a (B, N) array of channel likelihoods, one frame per row. A single frame of shape (N,) is also accepted.
+
+        Returns
+        ----------
+        ndarray<uint8>
+            a (B, N) array of the decoded bits, in the same order as the output of `SCD.decode`
+
+        """
+
+        N = self.myPC.N
+        n = self.myPC.n
+        if self.sc_decode is not None:
+            u_hat = self.sc_decode(llrs[..., self.order].reshape(-1, N), self.frozen_mask, self.f_index)
+            return u_hat.reshape(llrs.shape)[..., self.order]
+
+        self.allocate(llrs.shape[:-1])
+        L = self.L
+        B = self.B
+        u_hat = np.zeros(llrs.shape, dtype=np.uint8)
+        L[0][:] = llrs[..., self.order]
+
+        for i in range(N):
+            # evaluate the LLRs of every new node on the path to leaf i
+            self.update_llrs(i)
+
+            # make hard decision at output
+            if not self.frozen_mask[i]:
+                u_hat[..., i] = L[n][..., 0] < 0
+
+            # propagate the hard decision just made
+            B[n][..., 0] = u_hat[..., i]
+            self.update_bits(i)
+        return u_hat[..., self.order]
+
+    def update_llrs(self, i):
+        N = self.myPC.N
+        n = self.myPC.n
+        L = self.L
+        scalar_size = self.scalar_size if L[0].ndim == 1 else 0
+        d = self.llr_depths[i]
+        if i > 0:  # lower branch at the depth of the lowest set bit of i
+            h = N >> d
+            if h > scalar_size:
+                L[d][:] = self.lower_llrs(L[d - 1][..., h:], L[d - 1][..., :h], self.B[d - 1][..., :h])
+            else:
+                parent = L[d - 1]
+                bits = self.B[d - 1]
+                for k in range(h):
+                    L[d][k] = lower_llr(parent[k + h], parent[k], bits[k])
+            d += 1
+        for s in range(d, n + 1):  # upper branches down to the leaf
+            h = N >> s
+            if h > scalar_size:
+                L[s][:] = self.upper_llrs(L[s - 1][..., :h], L[s - 1][..., h:])
+            else:
+                parent = L[s - 1]
+                for k in range(h):
+                    L[s][k] = self.upper_llr(parent[k], parent[k + h])
+
+    def update_bits(self, i):
+        # the bits of a completed node are written to its half of the parent node
+        N = self.myPC.N
+        B = self.B
+        d = self.myPC.n
+        while d > 0:
+            h = N >> d
+            if i & 1:  # lower branch: the parent node is completed
+                B[d - 1][..., h:] = B[d]
+                B[d - 1][..., :h] ^= B[d]
+                d -= 1
+                i >>= 1
+            else:  # upper branch: keep the bits for the lower branch
+                B[d - 1][..., :h] = B[d]
+                break
@@ -8,8 +8,14 @@ from polarcodes.decoder_utils import *
 from polarcodes.Construct import Construct
 from polarcodes.Shorten import Shorten
 from polarcodes.Encode import Encode
+from polarcodes.BatchEncode import BatchEncode
 from polarcodes.Decode import Decode
+from polarcodes.BatchDecode import BatchDecode
+from polarcodes.Pipeline import Pipeline
 from polarcodes.AWGN import AWGN
+from polarcodes.CRC import CRC
+from polarcodes.ConstructionCache import ConstructionCache
+from polarcodes.Profiler import Profiler
 from polarcodes.Puncture import Puncture
 from polarcodes.PolarCode import PolarCode
 from polarcodes.GUI import GUI
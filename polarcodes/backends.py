@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+
+"""
+Kernel backends for the decoders and the mothercode construction. A backend is a dict of kernels that is registered
+by name with `register_backend`, and `Decode` and `Construct` select one at runtime with `get_backend`.
+
+A backend has the kernels:
+    'f_functions': the f-functions for the top branch LLRs, as in `decoder_utils.f_functions`.
+    'lower_llrs': the g-function for the bottom branch LLRs, as in `decoder_utils.lower_llrs`.
+    'sc_decode': a compiled walk of the whole successive cancellation tree (see `sc_decode_kernel`), or None to
+                 use the vectorised tree walk of the decoder. Its f-function is selected by the index of its name
+                 in `f_indices`.
+    'bhattacharyya': the Bhattacharyya parameters of the bit-channels (see `bhattacharyya_stages`).
+
+The 'numpy' backend is always available. The 'numba' backend is registered when Numba is installed, and it uses the
+same algorithms compiled to machine code. Its decoders make the same decisions as the 'numpy' backend, but the
+construction can differ in the last digits, since the log/exp functions of Numba round differently to those of NumPy.
+The 'numba' kernels read `decoder_utils.min_sum_offset` and `decoder_utils.min_sum_scale` when they are compiled.
+"""
+
+import numpy as np
+import warnings
+from polarcodes.utils import *
+from polarcodes.decoder_utils import *
+
+try:
+    import numba
+    jit = numba.njit(cache=True)
+except ImportError:
+    numba = None
+
+    def jit(func):
+        return func
+
+backends = {}
+
+# the f-functions of `sc_decode_kernel`, by the names of `decoder_utils.f_functions`
+f_indices = {'exact': 0, 'min_sum': 1, 'offset_min_sum': 2, 'normalised_min_sum': 3}
+
+def register_backend(name, kernels):
+    """
+    Register a kernel backend, replacing any backend with the same name.
+
+    Parameters
+    ----------
+    name: string
+        the name used to select the backend
+    kernels: dict
+        the kernels of the backend, with the keys 'f_functions', 'lower_llrs', 'sc_decode' and 'bhattacharyya'
+
+    """
+
+    backends[name] = kernels
+
+def get_backend(name='numpy'):
+    """
+    Get a kernel backend by name. 'auto' selects 'numba' if it is available, and 'numpy' otherwise.
+    A backend that is not available (e.g. 'numba' without Numba installed) falls back to 'numpy' with a warning.
+
+    Parameters
+    ----------
+    name: string
+        the name of a registered backend, or 'auto'
+
+    Returns
+    ----------
+    dict
+        the kernels of the backend
+
+    """
+
+    if name == 'auto':
+        name = 'numba' if 'numba' in backends else 'numpy'
+    if name not in backends:
+        warnings.warn("Kernel backend '" + str(name) + "' is not available, using 'numpy' instead.")
+        name = 'numpy'
+    return backends[name]
+
+def bhattacharyya_stages(z0, n):
+    """
+    Evolve the Bhattacharyya parameters of the channel through the n stages of the polar transform.
+    Each stage is vectorised over all of the channels, and the shortened channels with infinite likelihoods
+    are handled with masks.
+
+    Parameters
+    ----------
+    z0: ndarray<float>
+        the initial Bhattacharyya parameters of the N channels in the log-domain
+    n: int
+        the number of stages
+
+    Returns
+    ----------
+    ndarray<float>
+        the Bhattacharyya parameters of the N bit-channels in the log-domain
+
+    """
+
+    # each stage combines the top and bottom halves of blocks of 2h channels, for all blocks at once
+    z = np.array(z0, dtype=np.float64)
+    for j in range(1, n + 1):
+        h = 2 ** (j - 1)
+        blocks = z.reshape(-1, 2, h)
+        z_top = blocks[:, 0, :]
+        z_bottom = blocks[:, 1, :]
+
+        # principal equations, with the same operations as `logdomain_sum` and `logdomain_diff`.
+        # np.logaddexp rounds differently to `logdomain_sum`, so it is not used.
+        with np.errstate(invalid='ignore'):
+            z_max = np.maximum(z_top, z_bottom)
+            z_sum = z_max + np.log1p(np.exp(np.minimum(z_top, z_bottom) - z_max))
+            z_prod = z_top + z_bottom
+            z_max = np.maximum(z_sum, z_prod)
+            z_new_top = z_max + np.log1p(-np.exp(np.minimum(z_sum, z_prod) - z_max))
+
+        # shortening infinity cases
+        top_inf = z_top == -np.inf
+        short = np.logical_or(top_inf, z_bottom == -np.inf)
+        z_new_top[short] = np.where(top_inf, z_bottom, z_top)[short]
+        blocks[:, 1, :] = z_prod
+        blocks[:, 0, :] = z_new_top
+    return z
+
+register_backend('numpy', {
+    'f_functions': f_functions,
+    'lower_llrs': lower_llrs,
+    'sc_decode': None,
+    'bhattacharyya': bhattacharyya_stages,
+})
+
+# Scalar kernels in a subset of Python that Numba can compile. They are plain Python functions without Numba.
+
+@jit
+def upper_llr_kernel(l1, l2):
+    # the same operations as `decoder_utils.upper_llrs`
+    if l1 == np.inf:
+        return l2
+    if l2 == np.inf:
+        return l1
+    s = l1 + l2
+    return (max(s, 0.0) + np.log1p(np.exp(-abs(s)))) - (max(l1, l2) + np.log1p(np.exp(-abs(l1 - l2))))
+
+@jit
+def upper_llr_min_sum_kernel(l1, l2):
+    return np.sign(l1) * np.sign(l2) * min(abs(l1), abs(l2))
+
+@jit
+def upper_llr_offset_min_sum_kernel(l1, l2):
+    llr = min(abs(l1), abs(l2))
+    if l1 != np.inf and l2 != np.inf:
+        llr = max(llr - min_sum_offset, 0.0)
+    return np.sign(l1) * np.sign(l2) * llr
+
+@jit
+def upper_llr_normalised_min_sum_kernel(l1, l2):
+    llr = np.sign(l1) * np.sign(l2) * min(abs(l1), abs(l2))
+    if l1 == np.inf or l2 == np.inf:
+        return llr
+    return min_sum_scale * llr
+
+@jit
+def upper_llr_f_kernel(l1, l2, f_index):
+    # the f-function with index f_index in `f_indices`
+    if f_index == 0:
+        return upper_llr_kernel(l1, l2)
+    if f_index == 1:
+        return upper_llr_min_sum_kernel(l1, l2)
+    if f_index == 2:
+        return upper_llr_offset_min_sum_kernel(l1, l2)
+    return upper_llr_normalised_min_sum_kernel(l1, l2)
+
+@jit
+def lower_llr_kernel(l1, l2, b):
+    if b == 0:
+        if l1 == np.inf or l2 == np.inf:
+            return np.inf
+        return l1 + l2
+    return l1 - l2
+
+@jit
+def logdomain_sum_kernel(x, y):
+    if x > y:
+        return x + np.log1p(np.exp(y - x))
+    return y + np.log1p(np.exp(x - y))
+
+@jit
+def logdomain_diff_kernel(x, y):
+    if x > y:
+        return x + np.log1p(-np.exp(y - x))
+    return y + np.log1p(-np.exp(x - y))
+
+@jit
+def sc_decode_kernel(llrs, frozen_mask, f_index):
+    """
+    Successive cancellation decoding of a batch of frames, with one scalar operation per tree node.
+    The tree is decoded in natural order, as in `VSCD`, with one LLR row and one bit row per depth of the tree.
+
+    Parameters
+    ----------
+    llrs: ndarray<float>
+        a (B, N) array of channel likelihoods, in the decoding order of `VSCD`
+    frozen_mask: ndarray<bool>
+        True for a frozen leaf, in decoding order
+    f_index: int
+        the index of the f-function in `f_indices`
+
+    Returns
+    ----------
+    ndarray<uint8>
+        a (B, N) array of the decoded bits, in decoding order
+
+    """
+
+    num_frames, N = llrs.shape
+    n = 0
+    while (1 << n) < N:
+        n += 1
+    u_hat = np.zeros((num_frames, N), dtype=np.uint8)
+    L = np.empty((n + 1, N))
+    B = np.zeros((n + 1, N), dtype=np.uint8)
+
+    for f in range(num_frames):
+        L[0, :] = llrs[f]
+        for i in range(N):
+            # lower branch at the depth of the lowest set bit of i, then the upper branches down to the leaf
+            d = 1
+            if i > 0:
+                tz = 0
+                while (i >> tz) & 1 == 0:
+                    tz += 1
+                d = n - tz
+                h = N >> d
+                for k in range(h):
+                    L[d, k] = lower_llr_kernel(L[d - 1, k + h], L[d - 1, k], B[d - 1, k])
+                d += 1
+            for s in range(d, n + 1):
+                h = N >> s
+                for k in range(h):
+                    L[s, k] = upper_llr_f_kernel(L[s - 1, k], L[s - 1, k + h], f_index)
+
+            # make hard decision at output
+            bit = 0
+            if not frozen_mask[i] and L[n, 0] < 0:
+                bit = 1
+            u_hat[f, i] = bit
+            B[n, 0] = bit
+
+            # the bits of a completed node are written to its half of the parent node
+            d = n
+            j = i
+            while d > 0:
+                h = N >> d
+                if j & 1:
+                    for k in range(h):
+                        B[d - 1, k + h] = B[d, k]
+                        B[d - 1, k] ^= B[d, k]
+                    d -= 1
+                    j >>= 1
+                else:
+                    for k in range(h):
+                        B[d - 1, k] = B[d, k]
+                    break
+    return u_hat
+
+@jit
+def bhattacharyya_kernel(z0, n):
+    # the same recursion as `bhattacharyya_stages`, in place on a single vector
+    N = len(z0)
+    z = z0.copy()
+    for j in range(1, n + 1):
+        h = 1 << (j - 1)
+        for t in range(0, N, 2 * h):
+            for k in range(t, t + h):
+                z_top = z[k]
+                z_bottom = z[k + h]
+                if z_top == -np.inf or z_bottom == -np.inf:
+                    z[k] = z_bottom if z_top == -np.inf else z_top
+                    z[k + h] = -np.inf
+                else:
+                    z[k] = logdomain_diff_kernel(logdomain_sum_kernel(z_top, z_bottom), z_top + z_bottom)
+                    z[k + h] = z_top + z_bottom
+    return z
+
+if numba is not None:
+    upper_llrs_kernel = numba.vectorize(['float64(float64, float64)'], cache=True)(upper_llr_kernel.py_func)
+    upper_llrs_min_sum_kernel = numba.vectorize(['float64(float64, float64)'], cache=True)(upper_llr_min_sum_kernel.py_func)
+    upper_llrs_offset_min_sum_kernel = numba.vectorize(['float64(float64, float64)'], cache=True)(
+        upper_llr_offset_min_sum_kernel.py_func)
+    upper_llrs_normalised_min_sum_kernel = numba.vectorize(['float64(float64, float64)'], cache=True)(
+        upper_llr_normalised_min_sum_kernel.py_func)
+    lower_llrs_ufunc = numba.vectorize(['float64(float64, float64, uint8)'], cache=True)(lower_llr_kernel.py_func)
+
+    def lower_llrs_kernel(l1, l2, b):
+        # inf - inf is computed and discarded for shortened bits, as in `decoder_utils.lower_llrs`
+        with np.errstate(invalid='ignore'):
+            return lower_llrs_ufunc(l1, l2, b)
+
+    register_backend('numba', {
+        'f_functions': {
+            'exact': (upper_llrs_kernel, upper_llr_kernel),
+            'min_sum': (upper_llrs_min_sum_kernel, upper_llr_min_sum_kernel),
+            'offset_min_sum': (upper_llrs_offset_min_sum_kernel, upper_llr_offset_min_sum_kernel),
+            'normalised_min_sum': (upper_llrs_normalised_min_sum_kernel, upper_llr_normalised_min_sum_kernel),
+        },
+        'lower_llrs': lower_llrs_kernel,
+        'sc_decode': sc_decode_kernel,
+        'bhattacharyya': bhattacharyya_kernel,
+    })
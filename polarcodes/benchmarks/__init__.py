@@ -0,0 +1,6 @@
+"""
+Benchmarks of the throughput, latency and peak memory of the encoders, the AWGN channel, the decoders and the
+mothercode constructions. Run ``python -m polarcodes.benchmarks --help`` for the command line options.
+"""
+
+from polarcodes.benchmarks.suite import *
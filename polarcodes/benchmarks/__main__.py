@@ -0,0 +1,4 @@
+import sys
+from polarcodes.benchmarks.suite import main
+
+sys.exit(main())
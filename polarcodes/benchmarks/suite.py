@@ -0,0 +1,378 @@
+#!/usr/bin/env python
+
+"""
+The benchmark suite. Every case is one implementation of one stage (encoder, channel, decoder or construction) for one
+code and batch size. A case is timed in ``repeats`` windows of at least ``min_time`` seconds each, which are interleaved
+with the windows of the other cases of the same code, and its time per frame is the median over the windows, so that a
+slow period of the machine does not show up as a regression. It is then called once more with ``tracemalloc`` to find
+its peak memory, since tracing slows the calls down. The results are saved as JSON, and they can be compared with a
+baseline from an earlier run to find regressions.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from polarcodes.PolarCode import PolarCode
+from polarcodes.Construct import Construct
+from polarcodes.Encode import Encode
+from polarcodes.BatchEncode import BatchEncode
+from polarcodes.AWGN import AWGN
+from polarcodes.Decode import Decode
+from polarcodes.BatchDecode import BatchDecode
+from polarcodes.backends import backends
+
+stages = ('encode', 'channel', 'decode', 'construct')
+frame_encoders = ('polar_encode', 'polar_encode_recursive', 'polar_encode_vectorised', 'systematic_encode')
+batch_encoders = ('polar_encode', 'systematic_encode')
+frame_decoders = ('scd', 'vscd', 'vscd_min_sum', 'fast_ssc', 'scl', 'quantised_scd')
+batch_decoders = ('vscd', 'vscd_min_sum', 'fast_ssc', 'quantised_scd')
+construction_types = ('bb', 'ga', 'pw')
+
+# the per-frame decoders that run a Python loop over the leaves, which take seconds per frame for the longest codes.
+# They are only run up to n = ``slow_max_n`` (see `run_suite`).
+slow_frame_decoders = ('scd', 'scl', 'quantised_scd')
+
+def time_case(run, frames_per_call, min_time=0.1, max_calls=10000, repeats=5):
+    """
+    Time a benchmark case. The case is called once to warm up, and then in ``repeats`` windows, each of which calls it
+    until ``min_time`` seconds have passed.
+
+    Parameters
+    ----------
+    run: function
+        a function without arguments that runs the case once
+    frames_per_call: int
+        the number of frames processed by each call of ``run``
+    min_time: float
+        the minimum time of each window, in seconds
+    max_calls: int
+        the maximum number of calls in each window
+    repeats: int
+        the number of windows
+
+    Returns
+    ----------
+    dict
+        the total number of frames and time in seconds, and the frames per second and the microseconds per frame of
+        the median window
+
+    """
+
+    return time_cases([run], [frames_per_call], min_time, max_calls, repeats)[0]
+
+def time_cases(runs, frames_per_call, min_time=0.1, max_calls=10000, repeats=5):
+    """
+    Time several benchmark cases as in `time_case`, with their windows interleaved: every case is timed for one
+    window in each of ``repeats`` rounds. The windows of a case are then spread over the whole time of the cases, so a
+    slow period of the machine affects one window of each case rather than all of the windows of one case.
+
+    Parameters
+    ----------
+    runs: list<function>
+        the functions without arguments that run each case once
+    frames_per_call: list<int>
+        the number of frames processed by each call of each case
+
+    Returns
+    ----------
+    list<dict>
+        the timing of each case, as returned by `time_case`
+
+    """
+
+    for run in runs:
+        run()
+    windows = [[] for _ in runs]
+    for _ in range(repeats):
+        for run, frames, case_windows in zip(runs, frames_per_call, windows):
+            num_calls = 0
+            start = time.perf_counter()
+            elapsed = 0
+            while num_calls < 1 or (elapsed < min_time and num_calls < max_calls):
+                run()
+                num_calls += 1
+                elapsed = time.perf_counter() - start
+            case_windows.append((num_calls * frames, elapsed))
+    timings = []
+    for case_windows in windows:
+        frames, seconds = np.sum(case_windows, axis=0)
+        us_per_frame = float(np.median([1e6 * elapsed / num_frames for num_frames, elapsed in case_windows]))
+        timings.append({
+            'frames': int(frames),
+            'seconds': float(seconds),
+            'frames_per_second': 1e6 / us_per_frame,
+            'us_per_frame': us_per_frame,
+        })
+    return timings
+
+def peak_memory(run):
+    """
+    The peak memory of one call of a benchmark case, in bytes, as traced by ``tracemalloc``.
+    """
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    run()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    if not tracing:
+        tracemalloc.stop()
+    return peak
+
+def encode_cases(myPC, batch_size, rng):
+    # (name, run) pairs of the encoders
+    if batch_size == 1:
+        myPC.set_message(rng.integers(2, size=myPC.get_message_length()))
+        for name in frame_encoders:
+            yield name, lambda name=name: Encode(myPC, name)
+    else:
+        messages = rng.integers(2, size=(batch_size, myPC.get_message_length()))
+        codewords = np.zeros((batch_size, myPC.N), dtype=np.uint8)
+        for name in batch_encoders:
+            encoder = BatchEncode(myPC, name)
+            yield name, lambda encoder=encoder: encoder.encode(messages, out=codewords)
+
+def channel_cases(myPC, batch_size, rng, Eb_No):
+    # (name, run) pairs of the AWGN channel
+    if batch_size == 1:
+        yield 'awgn', lambda: AWGN(myPC, Eb_No)
+    else:
+        codewords = BatchEncode(myPC).encode(rng.integers(2, size=(batch_size, myPC.get_message_length())))
+        llrs = np.zeros((batch_size, myPC.N))
+        channel = AWGN(myPC, Eb_No, manual=True)
+        yield 'awgn', lambda: channel.get_batch_likelihoods(codewords, rng=rng, out=llrs)
+
+def decode_cases(myPC, batch_size, rng, Eb_No, decoders, backend):
+    # (name, run) pairs of the decoders
+    if batch_size == 1:
+        myPC.set_message(rng.integers(2, size=myPC.get_message_length()))
+        Encode(myPC, 'polar_encode_vectorised')
+        AWGN(myPC, Eb_No)
+        for name in decoders:
+            if name in frame_decoders:
+                yield name, lambda name=name: Decode(myPC, name, backend=backend)
+    else:
+        codewords = BatchEncode(myPC).encode(rng.integers(2, size=(batch_size, myPC.get_message_length())))
+        llrs = AWGN(myPC, Eb_No, manual=True).get_batch_likelihoods(codewords, rng=rng)
+        messages_received = np.zeros((batch_size, myPC.K), dtype=np.uint8)
+        for name in decoders:
+            if name in batch_decoders:
+                decoder = BatchDecode(myPC, name, backend)
+                yield name, lambda decoder=decoder: decoder.decode(llrs, out=messages_received)
+
+def construct_cases(N, K, design_SNR, backend):
+    # (name, run) pairs of the mothercode constructions, each on its own code
+    for name in construction_types:
+        myPC = PolarCode(N, K)
+        myPC.construction_type = name
+        yield name, lambda myPC=myPC: Construct(myPC, design_SNR, backend=backend)
+
+def run_suite(n_values=range(6, 17), rates=(0.25, 0.5, 0.75), batch_sizes=(1, 256), stage_names=stages,
+              decoders=frame_decoders, design_SNR=2.0, Eb_No=2.0, min_time=0.1, repeats=5, slow_max_n=12,
+              backend='numpy', seed=1729, log=None):
+    """
+    Run the benchmark suite.
+
+    Parameters
+    ----------
+    n_values: iterable
+        the values of n for the block lengths N = 2^n
+    rates: iterable
+        the code rates, i.e. K = round(rate * N)
+    batch_sizes: iterable
+        the batch sizes. A batch size of 1 uses the frame-by-frame classes (`Encode`, `AWGN`, `Decode`), and larger
+        batch sizes use the batch classes (`BatchEncode`, `AWGN.get_batch_likelihoods`, `BatchDecode`).
+    stage_names: iterable
+        the stages to benchmark, from {'encode', 'channel', 'decode', 'construct'}
+    decoders: iterable
+        the names of the decoders to benchmark
+    design_SNR: float
+        the design SNR of the constructions, in decibels
+    Eb_No: float
+        E_b/N_o of the channel, in decibels
+    min_time: float
+        the minimum time of each timing window of a case, in seconds
+    repeats: int
+        the number of timing windows of each case, whose median time per frame is reported
+    slow_max_n: int
+        the largest n for the decoders in `slow_frame_decoders` with a batch size of 1, or None for no limit
+    backend: string
+        the kernel backend of the decoders and constructions (see `backends.get_backend`)
+    seed: int
+        the seed of the random messages and noise
+    log: file
+        a stream for progress messages, or None
+
+    Returns
+    ----------
+    dict
+        the configuration and the environment of the run, and a list of the results of the cases
+
+    """
+
+    config = {
+        'n_values': list(n_values),
+        'rates': list(rates),
+        'batch_sizes': list(batch_sizes),
+        'stages': list(stage_names),
+        'decoders': list(decoders),
+        'design_SNR': design_SNR,
+        'Eb_No': Eb_No,
+        'min_time': min_time,
+        'repeats': repeats,
+        'slow_max_n': slow_max_n,
+        'backend': backend,
+        'seed': seed,
+    }
+    results = []
+    rng = np.random.default_rng(seed)
+    for n in config['n_values']:
+        N = 2 ** n
+        for rate in config['rates']:
+            K = max(1, int(round(rate * N)))
+            myPC = PolarCode(N, K)
+            Construct(myPC, design_SNR)
+
+            # the cases of this code are timed together, with their windows interleaved
+            code_results = []
+            runs = []
+            for stage in config['stages']:
+                for batch_size in (config['batch_sizes'] if stage != 'construct' else [1]):
+                    if stage == 'encode':
+                        cases = encode_cases(myPC, batch_size, rng)
+                    elif stage == 'channel':
+                        cases = channel_cases(myPC, batch_size, rng, Eb_No)
+                    elif stage == 'decode':
+                        decoders = [name for name in config['decoders'] if batch_size > 1 or slow_max_n is None
+                                    or n <= slow_max_n or name not in slow_frame_decoders]
+                        cases = decode_cases(myPC, batch_size, rng, Eb_No, decoders, backend)
+                    else:
+                        cases = construct_cases(N, K, design_SNR, backend)
+                    for name, run in cases:
+                        code_results.append({'stage': stage, 'name': name, 'N': N, 'K': K, 'batch_size': batch_size})
+                        runs.append(run)
+            timings = time_cases(runs, [result['batch_size'] for result in code_results], min_time, repeats=repeats)
+            for result, run, timing in zip(code_results, runs, timings):
+                result.update(timing)
+                result['peak_memory_bytes'] = peak_memory(run)
+                results.append(result)
+                if log is not None:
+                    print(format_result(result), file=log, flush=True)
+    return {'config': config, 'environment': environment(), 'results': results}
+
+def environment():
+    # the versions that the results depend on
+    numba = sys.modules.get('numba')
+    return {
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'numba': None if numba is None else numba.__version__,
+        'backends': sorted(backends),
+    }
+
+def case_key(result):
+    return (result['stage'], result['name'], result['N'], result['K'], result['batch_size'])
+
+def format_result(result):
+    return '{:<9} {:<24} N={:<6} K={:<6} B={:<5} {:>12.1f} frames/s {:>12.2f} us/frame {:>10.1f} KiB'.format(
+        result['stage'], result['name'], result['N'], result['K'], result['batch_size'], result['frames_per_second'],
+        result['us_per_frame'], result['peak_memory_bytes'] / 1024)
+
+def compare(results, baseline, tolerance=0.5):
+    """
+    Compare benchmark results with a baseline. A case is a regression if its median time per frame or its peak memory
+    is more than ``tolerance`` times larger than in the baseline. Cases that are not in both runs are ignored.
+    The run-to-run noise depends on the machine: on a shared machine, whole runs can be 20-30% slower than others, so
+    the default ``tolerance`` only finds large (e.g. algorithmic) regressions, and a smaller one such as 0.1 is only
+    reliable on a quiet machine.
+
+    Parameters
+    ----------
+    results: dict
+        the output of `run_suite`
+    baseline: dict
+        the output of an earlier `run_suite`, e.g. loaded from its JSON file
+    tolerance: float
+        the allowed relative increase
+
+    Returns
+    ----------
+    list<dict>
+        the regressions, each with the case, the measure, and its baseline and new values
+
+    """
+
+    baseline_results = {case_key(r): r for r in baseline['results']}
+    regressions = []
+    for result in results['results']:
+        old = baseline_results.get(case_key(result))
+        if old is None:
+            continue
+        for measure in ('us_per_frame', 'peak_memory_bytes'):
+            if result[measure] > (1 + tolerance) * old[measure]:
+                regression = {k: result[k] for k in ('stage', 'name', 'N', 'K', 'batch_size')}
+                regression.update({'measure': measure, 'baseline': old[measure], 'value': result[measure],
+                                   'ratio': result[measure] / old[measure] if old[measure] > 0 else np.inf})
+                regressions.append(regression)
+    return regressions
+
+def main(argv=None):
+    """
+    The command line interface, ``python -m polarcodes.benchmarks``.
+
+    Returns
+    ----------
+    int
+        the exit status: 1 if a baseline is given and there are regressions, else 0
+
+    """
+
+    parser = argparse.ArgumentParser(prog='python -m polarcodes.benchmarks', description=__doc__)
+    parser.add_argument('--n-min', type=int, default=6, help='the smallest n of the block lengths N = 2^n')
+    parser.add_argument('--n-max', type=int, default=16, help='the largest n of the block lengths N = 2^n')
+    parser.add_argument('--rates', type=float, nargs='+', default=[0.25, 0.5, 0.75], help='the code rates')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 256], help='the batch sizes')
+    parser.add_argument('--stages', nargs='+', default=list(stages), choices=stages, help='the stages')
+    parser.add_argument('--decoders', nargs='+', default=list(frame_decoders), help='the decoders')
+    parser.add_argument('--backend', default='numpy', help="the kernel backend, e.g. 'numba'")
+    parser.add_argument('--min-time', type=float, default=0.1,
+                        help='the minimum time of each timing window of a case, in seconds')
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='the number of timing windows of each case, whose median time per frame is reported')
+    parser.add_argument('--slow-max-n', type=int, default=12,
+                        help='the largest n for the per-frame ' + ', '.join(slow_frame_decoders) + ' decoders')
+    parser.add_argument('--seed', type=int, default=1729, help='the seed of the random messages and noise')
+    parser.add_argument('--quick', action='store_true', help='a small sweep: N <= 2^10, rate 0.5 and batch sizes 1, 64')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    parser.add_argument('--baseline', help='compare the results with this JSON file from an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='the allowed relative increase from the baseline')
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.n_max = min(args.n_max, 10)
+        args.rates = [0.5]
+        args.batch_sizes = [1, 64]
+
+    results = run_suite(range(args.n_min, args.n_max + 1), args.rates, args.batch_sizes, args.stages, args.decoders,
+                        min_time=args.min_time, repeats=args.repeats, slow_max_n=args.slow_max_n, backend=args.backend,
+                        seed=args.seed, log=sys.stderr)
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+
+    if args.baseline is not None:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print('REGRESSION {} {} N={} K={} B={}: {} {:.4g} -> {:.4g} ({:.2f}x)'.format(
+                r['stage'], r['name'], r['N'], r['K'], r['batch_size'], r['measure'], r['baseline'], r['value'],
+                r['ratio']))
+        print(len(regressions), 'regressions against', args.baseline)
+        return 1 if len(regressions) > 0 else 0
+    return 0
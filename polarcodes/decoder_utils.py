@@ -11,6 +11,13 @@ def hard_decision(y):
     else:
         return 1
 
+def hard_decisions(y):
+    """
+        Hard decisions of a vector of log-likelihoods.
+    """
+
+    return (y < 0).astype(np.uint8)
+
 def upper_llr(l1, l2):
     """
     Update top branch LLR in the log-domain.
@@ -69,6 +76,184 @@ def lower_llr(l1, l2, b):
         return l1 - l2
     return np.nan
 
+def upper_llrs(l1, l2):
+    """
+    Vectorised version of :func:`upper_llr`, using the exact box-plus operation.
+    It performs the same floating-point operations as :func:`upper_llr`, so the results are identical.
+
+    Parameters
+    ----------
+    l1: ndarray<float>
+        input LLRs corresponding to the top branches
+    l2: ndarray<float>
+        input LLRs corresponding to the bottom branches
+
+    Returns
+    ----------
+    ndarray<float>
+        the top branch LLRs at the next stage of the decoding tree
+
+    """
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        s = l1 + l2
+        llr = (np.maximum(s, 0) + np.log1p(np.exp(-np.abs(s)))) - \
+              (np.maximum(l1, l2) + np.log1p(np.exp(-np.abs(l1 - l2))))
+
+    # infinite LLR cases, used in shortening
+    llr = np.where(l1 == np.inf, l2, llr)
+    return np.where(l2 == np.inf, l1, llr)
+
+def upper_llrs_min_sum(l1, l2):
+    """
+    Vectorised min-sum approximation of :func:`upper_llr`.
+    Infinite LLRs from shortening are handled naturally by the minimum.
+
+    Parameters
+    ----------
+    l1: ndarray<float>
+        input LLRs corresponding to the top branches
+    l2: ndarray<float>
+        input LLRs corresponding to the bottom branches
+
+    Returns
+    ----------
+    ndarray<float>
+        the top branch LLRs at the next stage of the decoding tree
+
+    """
+
+    return np.sign(l1) * np.sign(l2) * np.minimum(np.abs(l1), np.abs(l2))
+
+def lower_llrs(l1, l2, b):
+    """
+    Vectorised version of :func:`lower_llr`.
+
+    Parameters
+    ----------
+    l1: ndarray<float>
+        input LLRs corresponding to the bottom branches
+    l2: ndarray<float>
+        input LLRs corresponding to the top branches
+    b: ndarray<int>
+        the decoded bits of the top branches
+
+    Returns
+    ----------
+    ndarray<float>
+        the bottom branch LLRs at the next stage of the decoding tree
+
+    """
+
+    with np.errstate(invalid='ignore'):
+        llr_sum = np.where((l1 == np.inf) | (l2 == np.inf), np.inf, l1 + l2)
+        return np.where(b == 0, llr_sum, l1 - l2)
+
+def upper_llr_min_sum(l1, l2):
+    """
+    Min-sum approximation of :func:`upper_llr`.
+    Infinite LLRs from shortening are handled naturally by the minimum.
+    """
+
+    return np.sign(l1) * np.sign(l2) * min(abs(l1), abs(l2))
+
+# the correction terms of the offset and normalised min-sum f-functions
+min_sum_offset = 0.1
+min_sum_scale = 0.75
+
+def upper_llrs_offset_min_sum(l1, l2, offset=min_sum_offset):
+    """
+    Vectorised offset min-sum approximation of :func:`upper_llr`. The magnitude of the min-sum LLR is reduced by
+    ``offset`` (but not below zero), which corrects the overestimate of the min-sum approximation. The offset is
+    subtracted at every stage of the tree, so it should be small compared to the channel LLRs.
+    An infinite LLR from shortening passes the other LLR unchanged, as in :func:`upper_llr`.
+
+    Parameters
+    ----------
+    l1: ndarray<float>
+        input LLRs corresponding to the top branches
+    l2: ndarray<float>
+        input LLRs corresponding to the bottom branches
+    offset: float
+        the offset subtracted from the magnitude of each LLR
+
+    Returns
+    ----------
+    ndarray<float>
+        the top branch LLRs at the next stage of the decoding tree
+
+    -------------
+    **References:**
+
+    * Chen, J., & Fossorier, M. P. C. (2002). Near Optimum Universal Belief Propagation Based Decoding of Low-Density Parity Check Codes. IEEE Transactions on Communications, 50(3), 406–414.
+
+    """
+
+    llr = np.minimum(np.abs(l1), np.abs(l2))
+    finite = np.logical_and(np.isfinite(l1), np.isfinite(l2))
+    return np.sign(l1) * np.sign(l2) * np.where(finite, np.maximum(llr - offset, 0), llr)
+
+def upper_llrs_normalised_min_sum(l1, l2, scale=min_sum_scale):
+    """
+    Vectorised normalised min-sum approximation of :func:`upper_llr`. The min-sum LLR is scaled by ``scale``,
+    which corrects the overestimate of the min-sum approximation.
+    An infinite LLR from shortening passes the other LLR unchanged, as in :func:`upper_llr`.
+    Scaling every LLR of a subtree does not change the signs of its decisions, so successive cancellation decoders
+    make the same decisions as with the min-sum f-function, and only the path metrics of the list decoder differ.
+
+    Parameters
+    ----------
+    l1: ndarray<float>
+        input LLRs corresponding to the top branches
+    l2: ndarray<float>
+        input LLRs corresponding to the bottom branches
+    scale: float
+        the scaling factor of each LLR, between 0 and 1
+
+    Returns
+    ----------
+    ndarray<float>
+        the top branch LLRs at the next stage of the decoding tree
+
+    -------------
+    **References:**
+
+    * Chen, J., & Fossorier, M. P. C. (2002). Near Optimum Universal Belief Propagation Based Decoding of Low-Density Parity Check Codes. IEEE Transactions on Communications, 50(3), 406–414.
+
+    """
+
+    llr = np.sign(l1) * np.sign(l2) * np.minimum(np.abs(l1), np.abs(l2))
+    finite = np.logical_and(np.isfinite(l1), np.isfinite(l2))
+    return np.where(finite, scale * llr, llr)
+
+def upper_llr_offset_min_sum(l1, l2, offset=min_sum_offset):
+    """
+    Offset min-sum approximation of :func:`upper_llr` (see :func:`upper_llrs_offset_min_sum`).
+    """
+
+    llr = min(abs(l1), abs(l2))
+    if l1 != np.inf and l2 != np.inf:
+        llr = max(llr - offset, 0)
+    return np.sign(l1) * np.sign(l2) * llr
+
+def upper_llr_normalised_min_sum(l1, l2, scale=min_sum_scale):
+    """
+    Normalised min-sum approximation of :func:`upper_llr` (see :func:`upper_llrs_normalised_min_sum`).
+    """
+
+    llr = np.sign(l1) * np.sign(l2) * min(abs(l1), abs(l2))
+    if l1 == np.inf or l2 == np.inf:
+        return llr
+    return scale * llr
+
+# f-functions available to the vectorised decoders, as (vectorised, scalar) pairs
+f_functions = {
+    'exact': (upper_llrs, upper_llr),
+    'min_sum': (upper_llrs_min_sum, upper_llr_min_sum),
+    'offset_min_sum': (upper_llrs_offset_min_sum, upper_llr_offset_min_sum),
+    'normalised_min_sum': (upper_llrs_normalised_min_sum, upper_llr_normalised_min_sum),
+}
+
 def active_llr_level(i, n):
     """
         Find the first 1 in the binary expansion of i.
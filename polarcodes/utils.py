@@ -6,6 +6,35 @@ algorithm implementations.
 """
 
 import numpy as np
+from statistics import NormalDist
+
+# bit-reversal permutations of {0,1,...,2^n-1}, cached for each n by `bit_reversal_table`
+bit_reversal_tables = {}
+
+def bit_reversal_table(n):
+    """
+    The bit-reversal permutation of the indices {0,1,...,2^n-1}. The table for each n is computed once and cached,
+    so it is read-only.
+
+    Parameters
+    ----------
+    n: int
+        number of bits per index
+
+    Returns
+    ----------
+    ndarray<int>
+        the bit-reversed index of each index
+
+    """
+
+    if n not in bit_reversal_tables:
+        table = np.zeros(1, dtype=int)
+        for i in range(n):  # the table for i + 1 bits from the table for i bits
+            table = np.concatenate((2 * table, 2 * table + 1))
+        table.flags.writeable = False
+        bit_reversal_tables[n] = table
+    return bit_reversal_tables[n]
 
 def bit_reversed(x, n):
     """
@@ -25,11 +54,10 @@ def bit_reversed(x, n):
 
     """
 
-    result = 0
-    for i in range(n):  # for each bit number
-        if (x & (1 << i)):  # if it matches that bit
-            result |= (1 << (n - 1 - i))  # set the "opposite" bit in result
-    return result
+    if n > 20:  # too many bits for a table
+        return bit_perm(x, np.arange(n), n)
+    result = bit_reversal_table(n)[x]
+    return result if np.ndim(result) > 0 else int(result)
 
 def logdomain_diff(x, y):
     """
@@ -99,11 +127,11 @@ def bit_perm(x, p, n):
 
     """
 
-    result = 0
-    for i in range(n):
-        b = (x >> p[i]) & 1
-        result ^= (-b ^ result) & (1 << (n - i - 1))
-    return result
+    x = np.asarray(x, dtype=int)
+    result = np.zeros_like(x)
+    for i in range(n):  # bit n-i-1 of the result is bit p[i] of x
+        result |= ((x >> p[i]) & 1) << (n - i - 1)
+    return result if result.ndim > 0 else int(result)
 
 # find hamming weight of an index x
 def hamming_wt(x, n):
@@ -112,30 +140,28 @@ def hamming_wt(x, n):
 
     Parameters
     ----------
-    x: int
-        an index
+    x: ndarray<int>, int
+        a vector of indices
     n: int
         number of bits in ``x``
 
     Returns
     ----------
-    int
+    ndarray<int>, int
         bit-wise hamming weight of ``x``
 
     """
 
-    m = 1
-    wt = 0
+    x = np.asarray(x, dtype=int)
+    wt = np.zeros_like(x)
     for i in range(n):
-        b = (x >> i) & m
-        if b:
-            wt = wt + 1
-    return wt
+        wt += (x >> i) & 1
+    return wt if wt.ndim > 0 else int(wt)
 
 # sort by hamming_wt()
 def sort_by_wt(x, n):
     """
-    Sort a vector by index hamming weights using hamming_wt().
+    Sort a vector by index hamming weights using hamming_wt(). Indices with the same weight keep their order.
 
     Parameters
     ----------
@@ -151,11 +177,8 @@ def sort_by_wt(x, n):
 
     """
 
-    wts = np.zeros(len(x), dtype=int)
-    for i in range(len(x)):
-        wts[i] = hamming_wt(x[i], n)
-    mask = np.argsort(wts)
-    return x[mask]
+    x = np.asarray(x)
+    return x[np.argsort(hamming_wt(x, n), kind='mergesort')]
 
 def inverse_set(F, N):
     """
@@ -175,16 +198,13 @@ def inverse_set(F, N):
 
     """
 
-    n = int(np.log2(N))
-    not_F = []
-    for i in range(N):
-        if i not in F:
-            not_F.append(i)
-    return np.array(not_F)
+    mask = np.ones(N, dtype=bool)
+    mask[np.asarray(F, dtype=int)] = False
+    return np.flatnonzero(mask)
 
 def subtract_set(X, Y):
     """
-    Subtraction of two sets.
+    Subtraction of two sets. The order of the elements of ``X`` is kept.
 
     Parameters
     ----------
@@ -200,11 +220,8 @@ def subtract_set(X, Y):
 
     """
 
-    X_new = []
-    for x in X:
-        if x not in Y:
-            X_new.append(x)
-    return np.array(X_new)
+    X = np.asarray(X, dtype=int)
+    return X[np.isin(X, np.asarray(Y, dtype=int), invert=True)]
 
 def arikan_gen(n):
     """
@@ -228,21 +245,281 @@ def arikan_gen(n):
         F_n = np.kron(F, F_n)
     return F_n
 
+def polar_transform(u, out=None):
+    """
+    The polar transform of the last axis of ``u``, i.e. the same operation as `Encode.polar_encode`.
+    It is done as log2(N) stages of XORs between the two halves of reshaped blocks, so any number of
+    leading batch axes are transformed at once. The transform is its own inverse.
+
+    Parameters
+    ----------
+    u: ndarray<int>
+        a vector of bits, or an array of bit vectors along the last axis
+    out: ndarray<int>
+        a C-contiguous array with the shape of ``u`` for the result, which may be ``u`` itself to transform it in place.
+        By default a new array is returned.
+
+    Returns
+    ----------
+    ndarray<int>
+        the transformed bits, with the same shape and type as ``u``
+
+    """
+
+    if out is None:
+        x = np.array(u, copy=True)
+    else:
+        x = out
+        if x is not u:
+            x[...] = u
+    N = x.shape[-1]
+    h = N // 2
+    while h >= 1:
+        blocks = x.reshape(x.shape[:-1] + (N // (2 * h), 2, h))
+        blocks[..., 0, :] ^= blocks[..., 1, :]
+        h //= 2
+    return x
+
+def pw_sequence(n, beta=2 ** 0.25):
+    """
+    The polarization weight (PW) reliability sequence, from the beta-expansion of the indices.
+    The sequence is nested, so the sequence for any N <= 2^n is the entries of this sequence that are less than N.
+
+    Parameters
+    ----------
+    n: int
+        number of bits per index, i.e. the sequence is for N_max = 2^n
+    beta: float
+        the base of the expansion
+
+    Returns
+    ----------
+    ndarray<uint16>, ndarray<uint32>
+        the indices from the least reliable to the most reliable, as uint16 for N_max <= 2^16 and uint32 otherwise
+
+    -------------
+    **References:**
+
+    * He, G., Belfiore, J.-C., Land, I., Yang, G., Liu, X., Chen, Y., Li, R., Wang, J., Ge, Y., Zhang, R., & Tong, W. (2017). Beta-Expansion: A Theoretical Framework for Fast and Recursive Construction of Polar Codes. IEEE Global Communications Conference (GLOBECOM).
+
+    """
+
+    indices = np.arange(2 ** n)
+    bits = (indices[:, np.newaxis] >> np.arange(n)) & 1
+    weights = np.dot(bits, beta ** np.arange(n))
+    dtype = np.uint16 if n <= 16 else np.uint32
+    return np.argsort(weights, kind='mergesort').astype(dtype)
+
+def frame_errors(num_errors):
+    """
+    Whether each frame is a frame error, i.e. has at least one bit error. Every simulation mode counts the frame
+    errors with this definition, so their FER values measure the same event.
+
+    Parameters
+    ----------
+    num_errors: int or ndarray<int>
+        the number of bit errors in each frame
+
+    Returns
+    ----------
+    bool or ndarray<bool>
+        True for each frame with a frame error
+
+    """
+
+    return num_errors > 0
+
+def accumulate_errors(num_errors, counts, min_errors, min_iters):
+    """
+    Add the bit errors of a block of simulated frames to the running error counts of a Monte-Carlo simulation.
+    A frame is counted as a frame error if it has at least one bit error (see `frame_errors`). The early stopping
+    condition is checked after every frame, so the counts stop at the first frame where early stopping is allowed.
+
+    Parameters
+    ----------
+    num_errors: ndarray<int>
+        the number of bit errors in each frame, in the order that the frames were simulated
+    counts: tuple
+        the number of frame errors, the number of bit errors, and the number of frames before this block
+    min_errors: int
+        the minimum number of frame errors before early stopping is allowed
+    min_iters: int
+        the minimum number of frames before early stopping is allowed
+
+    Returns
+    ----------
+    tuple, bool
+        the updated counts, and True if the early stopping condition is met
+
+    """
+
+    frame_error_counts = np.cumsum(frame_errors(num_errors)) + counts[0]
+    bit_errors = np.cumsum(num_errors) + counts[1]
+    frames = np.arange(counts[2] + 1, counts[2] + len(num_errors) + 1)
+    stop = np.flatnonzero(np.logical_and(frame_error_counts >= min_errors, frames >= min_iters))
+    last = stop[0] if len(stop) > 0 else len(num_errors) - 1
+    return (int(frame_error_counts[last]), int(bit_errors[last]), int(frames[last])), len(stop) > 0
+
+def normal_quantile(confidence):
+    """
+    The quantile of the standard normal distribution for a two-sided confidence level, e.g. 1.96 for 0.95.
+    """
+
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+def expected_relative_width(fer, num_frames, confidence=0.95):
+    """
+    The width of the confidence interval of a FER, relative to the FER, that is expected after simulating
+    ``num_frames`` frames. It uses the normal approximation of the interval, so ``fer`` should not be zero,
+    e.g. smooth it with (frame_errors + 0.5) / (num_frames + 1).
+
+    Parameters
+    ----------
+    fer: float or ndarray<float>
+        the estimated frame error rate
+    num_frames: int or ndarray<int>
+        the number of simulated frames
+    confidence: float
+        the confidence level of the interval
+
+    Returns
+    ----------
+    float or ndarray<float>
+        the expected width of the interval divided by ``fer``
+
+    """
+
+    return 2 * normal_quantile(confidence) * np.sqrt((1 - fer) / (fer * num_frames))
+
+def fer_confidence_interval(frame_errors, num_frames, confidence=0.95):
+    """
+    The Wilson score interval of a simulated frame error rate. Unlike the normal approximation, the interval stays
+    inside [0, 1] and it is not empty when no frame errors are observed.
+
+    Parameters
+    ----------
+    frame_errors: int or ndarray<int>
+        the number of frame errors
+    num_frames: int or ndarray<int>
+        the number of simulated frames
+    confidence: float
+        the confidence level of the interval
+
+    Returns
+    ----------
+    float or ndarray<float>, float or ndarray<float>
+        the lower and upper bounds of the interval
+
+    -------------
+    **References:**
+
+    *  Wilson, E. B. (1927). Probable Inference, the Law of Succession, and Statistical Inference. Journal of the American Statistical Association, 22(158), 209–212.
+
+    """
+
+    z = normal_quantile(confidence)
+    num_frames = np.asarray(num_frames, dtype=float)
+    p = np.asarray(frame_errors) / num_frames
+    scale = 1 + z ** 2 / num_frames
+    centre = (p + z ** 2 / (2 * num_frames)) / scale
+    half_width = z / scale * np.sqrt(p * (1 - p) / num_frames + z ** 2 / (4 * num_frames ** 2))
+    return np.maximum(centre - half_width, 0), np.minimum(centre + half_width, 1)
+
 # Gaussian Approximation helper functions:
 
 def phi_residual(x, val):
     return phi(x) - val
 
 def phi(x):
-    if x < 10:
-        y = -0.4527 * (x ** 0.86) + 0.0218
-        y = np.exp(y)
-    else:
-        y = np.sqrt(3.14159 / x) * (1 - 10 / (7 * x)) * np.exp(-x / 4)
-    return y
+    """
+    Chung's two-piece approximation of the function phi of the Gaussian Approximation, for a scalar or an array of means.
+
+    Parameters
+    ----------
+    x: ndarray<float>, float
+        the mean of a consistent Gaussian log-likelihood density
+
+    Returns
+    ----------
+    ndarray<float>, float
+        phi(x), with the same shape as ``x``
+
+    -------------
+    **References:**
+
+    * Chung, S.-Y., Richardson, T. J., & Urbanke, R. L. (2001). Analysis of Sum-Product Decoding of Low-Density Parity-Check Codes Using a Gaussian Approximation. IEEE Transactions on Information Theory, 47(2), 657–670.
+
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        y_low = np.exp(-0.4527 * (x ** 0.86) + 0.0218)
+        y_high = np.sqrt(3.14159 / x) * (1 - 10 / (7 * x)) * np.exp(-x / 4)
+    y_high = np.where(x == np.inf, 0, y_high)
+    return np.where(x < 10, y_low, y_high)[()]
 
 def phi_inv(y):
-    return bisection(y, 0, 10000)
+    """
+    The inverse of :func:`phi`, for a scalar or an array. The first piece of :func:`phi` is inverted in closed form,
+    and the second piece by Newton's method in the log-domain.
+
+    Parameters
+    ----------
+    y: ndarray<float>, float
+        values of phi, between 0 and 1
+
+    Returns
+    ----------
+    ndarray<float>, float
+        the means x such that phi(x) = y, where phi(0) = inf
+
+    """
+
+    y = np.asarray(y, dtype=np.float64)
+    shape = y.shape
+    y = y.reshape(-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_y = np.log(y)
+        x = np.maximum((0.0218 - log_y) / 0.4527, 0) ** (1 / 0.86)
+
+        # the second piece, for the values below the first piece at x = 10
+        high = np.logical_and(y <= np.exp(-0.4527 * (10 ** 0.86) + 0.0218), y > 0)
+        x_high = np.maximum(-4 * log_y[high], 10)
+        for i in range(50):
+            residual = 0.5 * np.log(3.14159 / x_high) + np.log(1 - 10 / (7 * x_high)) - x_high / 4 - log_y[high]
+            slope = -0.5 / x_high + 10 / (7 * x_high ** 2 - 10 * x_high) - 0.25
+            step = residual / slope
+            x_high = x_high - step
+            if np.all(np.abs(step) <= 1e-12 * x_high):
+                break
+    x[high] = x_high
+    x[y <= 0] = np.inf
+    return x.reshape(shape)[()]
+
+def phi_chung_exp(x):
+    """
+    Chung's first (exponential) piece of :func:`phi`, used for all ``x`` rather than only for x < 10.
+    It is less accurate than :func:`phi` for large means, but it has a closed-form inverse, :func:`phi_chung_exp_inv`.
+    """
+
+    with np.errstate(over='ignore'):
+        return np.exp(-0.4527 * (np.asarray(x, dtype=np.float64) ** 0.86) + 0.0218)[()]
+
+def phi_chung_exp_inv(y):
+    """
+    The inverse of :func:`phi_chung_exp`, for a scalar or an array.
+    """
+
+    with np.errstate(divide='ignore'):
+        return (np.maximum((0.0218 - np.log(y)) / 0.4527, 0) ** (1 / 0.86))[()]
+
+# approximations of phi for the Gaussian Approximation construction, as (phi, inverse of phi) pairs. 'chung' is the
+# two-piece approximation of Chung et al., which Trifonov (2012) also uses for the construction, and 'chung_exp' is its
+# first piece over the whole range. A separate Trifonov approximation of phi is not provided.
+phi_approximations = {
+    'chung': (phi, phi_inv),
+    'chung_exp': (phi_chung_exp, phi_chung_exp_inv),
+}
 
 def bisection(val, a, b):
     c = a
@@ -260,13 +537,16 @@ def bisection(val, a, b):
     return c
 
 def logQ_Borjesson(x):
+    """
+    Borjesson's approximation of the logarithm of the Gaussian Q-function, for a scalar or an array.
+    """
+
     a = 0.339
     b = 5.510
     half_log2pi = 0.5 * np.log(2 * np.pi)
-    if x < 0:
-        x = -x
-        y = -np.log((1 - a) * x + a * np.sqrt(b + x * x)) - (x * x / 2) - half_log2pi
-        y = np.log(1 - np.exp(y))
-    else:
-        y = -np.log((1 - a) * x + a * np.sqrt(b + x * x)) - (x * x / 2) - half_log2pi
-    return y
+    x = np.asarray(x, dtype=np.float64)
+    x_abs = np.abs(x)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        y = -np.log((1 - a) * x_abs + a * np.sqrt(b + x_abs * x_abs)) - (x_abs * x_abs / 2) - half_log2pi
+        y = np.where(x < 0, np.log(1 - np.exp(y)), y)
+    return y[()]
@@ -15,9 +15,9 @@ with open('data/pc_sim.json') as json_file:
 
 # compare test code with known correct values
 FER_test_data = np.array([
-        0.313,
-        0.126,
-        0.03,
+        0.315,
+        0.128,
+        0.031,
         0.004125412541254125
     ])
 BER_test_data = np.array([
@@ -0,0 +1,105 @@
+"""
+Regression tests for the constructions and the construction cache.
+Run with ``python -m pytest tests`` from the root of the repository.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from polarcodes.Construct import Construct
+from polarcodes.ConstructionCache import ConstructionCache
+from polarcodes.PolarCode import PolarCode
+from polarcodes.utils import pw_sequence
+
+
+def construct(N, K, design_SNR, construction_type='bb', cache=None):
+    myPC = PolarCode(N, K)
+    myPC.construction_type = construction_type
+    myPC.construction_cache = cache
+    Construct(myPC, design_SNR)
+    return myPC
+
+
+def test_cache_keys():
+    cache = ConstructionCache()
+    myPC = PolarCode(256, 128)
+    key = cache.key(myPC, 2.0, [])
+    assert cache.key(PolarCode(256, 128), 2.0, []) == key
+
+    # a different K at the same normalised design SNR has the same reliabilities
+    assert cache.key(PolarCode(256, 64), 2.0 + 10 * np.log10(2), []) == key
+
+    assert cache.key(PolarCode(512, 256), 2.0, []) != key
+    assert cache.key(myPC, 2.5, []) != key
+    assert cache.key(myPC, 2.0, [0, 1]) != key
+    myPC.construction_type = 'ga'
+    ga_key = cache.key(myPC, 2.0, [])
+    assert ga_key != key
+    myPC.ga_approximation = 'chung_exp'
+    assert cache.key(myPC, 2.0, []) != ga_key
+
+
+@pytest.mark.parametrize('construction_type', ['bb', 'ga'])
+def test_cache_returns_the_same_construction(tmp_path, construction_type):
+    expected = construct(256, 128, 2.0, construction_type)
+    cache = ConstructionCache(cache_dir=str(tmp_path))
+    for K in [128, 128, 96]:
+        myPC = construct(256, K, 2.0 + 10 * np.log10(128 / K), construction_type, cache)
+        if K == 128:
+            np.testing.assert_array_equal(myPC.frozen_lookup, expected.frozen_lookup)
+            np.testing.assert_array_equal(myPC.reliabilities, expected.reliabilities)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # a new cache loads the construction from the directory
+    cache = ConstructionCache(cache_dir=str(tmp_path))
+    myPC = construct(256, 128, 2.0, construction_type, cache)
+    np.testing.assert_array_equal(myPC.frozen_lookup, expected.frozen_lookup)
+    np.testing.assert_array_equal(myPC.z, expected.z)
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_cache_writes_are_atomic(tmp_path, monkeypatch):
+    cache = ConstructionCache(cache_dir=str(tmp_path))
+    key = cache.key(PolarCode(64, 32), 2.0, [])
+
+    # a write that fails before the file is renamed leaves no file under the name of the entry
+    def failing_replace(src, dst):
+        raise OSError('disk full')
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    with pytest.raises(OSError):
+        cache.put(key, np.arange(64), np.zeros(64))
+    monkeypatch.undo()
+    assert not os.path.exists(cache.filename(key))
+    assert ConstructionCache(cache_dir=str(tmp_path)).get(key) is None
+
+    # the partial file is not counted as an entry when the least recently used files are evicted
+    cache = ConstructionCache(cache_dir=str(tmp_path), max_files=2)
+    for design_SNR in [1.0, 2.0, 3.0]:
+        construct(64, 32, design_SNR, cache=cache)
+    entries = [f for f in os.listdir(tmp_path) if f.endswith('.npz') and not f.endswith('.tmp.npz')]
+    assert len(entries) == 2
+
+
+def test_pw_sequence():
+    # the weights of 0..7 are 0, 1, 1.19, 2.19, 1.41, 2.41, 2.60, 3.60 for beta = 2^(1/4)
+    np.testing.assert_array_equal(pw_sequence(3), [0, 1, 2, 4, 3, 5, 6, 7])
+    sequence = pw_sequence(10)
+    np.testing.assert_array_equal(np.sort(sequence), np.arange(1024))
+    for n in range(1, 10):
+        np.testing.assert_array_equal(sequence[sequence < 2 ** n], pw_sequence(n))
+
+
+def test_pw_construction_is_nested(monkeypatch):
+    # the construction is the same whether the sequence was computed for this block length or a longer one
+    monkeypatch.setattr(Construct, 'sequences', {})
+    short_first = [construct(64, K, 2.0, 'pw').frozen_lookup for K in range(65)]
+    construct(1024, 512, 2.0, 'pw')
+    for K in range(65):
+        np.testing.assert_array_equal(construct(64, K, 2.0, 'pw').frozen_lookup, short_first[K])
+
+    # the information set of a lower rate is a subset of the information set of a higher rate
+    info = np.array(short_first, dtype=bool)
+    assert np.all(info[:-1] <= info[1:])
+    np.testing.assert_array_equal(np.sum(info, axis=1), np.arange(65))
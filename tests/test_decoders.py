@@ -0,0 +1,216 @@
+"""
+Regression tests for the decoders: the SC decoder against outputs of the original implementation, and the decoders,
+backends and checkpoints that must give identical results to it.
+Run with ``python -m pytest tests`` from the root of the repository.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from polarcodes.AWGN import AWGN
+from polarcodes.BatchDecode import BatchDecode
+from polarcodes.BatchEncode import BatchEncode
+from polarcodes.Construct import Construct
+from polarcodes.Decode import Decode
+from polarcodes.Encode import Encode
+from polarcodes.FastSSC import FastSSC
+from polarcodes.PolarCode import PolarCode
+from polarcodes.Shorten import Shorten
+from polarcodes.utils import polar_transform
+from polarcodes.VSCD import VSCD
+
+# decoded messages (packed bits, in hex) of the original 'scd' for the LLRs of `random_llrs`
+BASELINE_MESSAGES = {
+    'polar': ['7240e7a8', 'fc9fc280', 'ea400000', '89f46000', '20502044', 'b0ec6ebf', '19cc0070', '046365ec',
+              '48268480', '6103f900', 'ee00b20c', '9bcfa044', 'fa8259b3', '00030600', '1b900000', 'bc72dcf3'],
+    'shortened': ['00000000', '80180000', '82002400', '01022200', 'd8b55490', '2bfb8c30', 'c8955490', '80000000',
+                  '066cc000', '9b161600', 'ccbdf1e0', '5b015600', '01833180', '02313280', '8c031800', '20be8110'],
+}
+SEEDS = {'polar': 11, 'shortened': 12}
+
+
+def make_code(name):
+    if name == 'polar':
+        myPC = PolarCode(64, 32)
+        Construct(myPC, 2.0)
+    else:
+        myPC = PolarCode(56, 28, ('shorten', 'brs', [], [], False))
+        Shorten(myPC, 2.0)
+    return myPC
+
+
+def random_llrs(myPC, seed, num_frames=16):
+    # noisy enough that most frames have decoding errors, with infinite LLRs for the shortened bits
+    llrs = np.random.default_rng(seed).normal(2.0, 2.5, size=(num_frames, myPC.N))
+    if myPC.punct_flag:
+        llrs[:, myPC.source_set_lookup == 0] = np.inf
+    return llrs
+
+
+def decode_frames(myPC, llrs, decoder_name, **kwargs):
+    messages = []
+    for llr in llrs:
+        myPC.likelihoods = llr.copy()
+        Decode(myPC, decoder_name, **kwargs)
+        messages.append(np.array(myPC.message_received, dtype=np.uint8))
+    return np.array(messages)
+
+
+@pytest.fixture(params=['polar', 'shortened'])
+def code_name(request):
+    return request.param
+
+
+def test_scd_matches_baseline(code_name):
+    myPC = make_code(code_name)
+    messages = decode_frames(myPC, random_llrs(myPC, SEEDS[code_name]), 'scd')
+    assert [np.packbits(m).tobytes().hex() for m in messages] == BASELINE_MESSAGES[code_name]
+
+
+def test_vscd_matches_scd(code_name):
+    myPC = make_code(code_name)
+    llrs = random_llrs(myPC, SEEDS[code_name])
+    expected = decode_frames(myPC, llrs, 'scd')
+    np.testing.assert_array_equal(decode_frames(myPC, llrs, 'vscd'), expected)
+    np.testing.assert_array_equal(BatchDecode(myPC, 'vscd').decode(llrs), expected)
+
+
+def test_scl_list_size_one_matches_scd(code_name):
+    myPC = make_code(code_name)
+    llrs = random_llrs(myPC, SEEDS[code_name])
+    np.testing.assert_array_equal(decode_frames(myPC, llrs, 'scl', list_size=1), decode_frames(myPC, llrs, 'scd'))
+
+
+def test_fast_ssc_without_spc_matches_scd(code_name):
+    myPC = make_code(code_name)
+    llrs = random_llrs(myPC, SEEDS[code_name])
+    fast_ssc = FastSSC(myPC, special_nodes=('rate0', 'rate1', 'rep'))
+    assert {'rate0', 'rate1', 'rep'} <= {op for op, d, j in fast_ssc.instructions}
+    np.testing.assert_array_equal(fast_ssc.decode_batch(llrs), VSCD(myPC).decode_batch(llrs))
+
+
+def test_fast_ssc_spc_nodes(code_name):
+    myPC = make_code(code_name)
+    llrs = random_llrs(myPC, SEEDS[code_name], num_frames=64)
+    fast_ssc = FastSSC(myPC)
+    assert 'spc' in {op for op, d, j in fast_ssc.instructions}
+    u_hat = fast_ssc.decode_batch(llrs)
+    assert not np.any(u_hat[:, myPC.frozen_lookup == 0])
+
+
+@pytest.mark.parametrize('node_type', ['rep', 'spc'])
+def test_fast_ssc_nodes_are_maximum_likelihood(node_type):
+    # the node output is the codeword of the node with the largest correlation with the LLRs, over all 8-bit words
+    fast_ssc = FastSSC(make_code('polar'))
+    words = (np.arange(256)[:, np.newaxis] >> np.arange(8)) & 1
+    if node_type == 'rep':
+        words = words[np.all(words == words[:, :1], axis=1)]
+    else:
+        words = words[np.sum(words, axis=1) % 2 == 0]
+    llrs = np.random.default_rng(5).normal(0.5, 2.0, size=(100, 8))
+    best = words[np.argmax(llrs @ (1 - 2 * words.T), axis=1)]
+    np.testing.assert_array_equal(fast_ssc.decode_node(node_type, llrs), best)
+
+
+def transmit_frames(myPC, Eb_No, seed, num_frames, encoder_name='polar_encode'):
+    # random messages through the AWGN channel, with the messages and the LLRs of each frame
+    np.random.seed(seed)
+    messages, llrs = [], []
+    for _ in range(num_frames):
+        myPC.set_message(np.random.randint(2, size=myPC.get_message_length()))
+        Encode(myPC, encoder_name)
+        AWGN(myPC, Eb_No)
+        messages.append(myPC.message)
+        llrs.append(myPC.likelihoods)
+    return np.array(messages, dtype=np.uint8), np.array(llrs)
+
+
+def test_crc_aided_scl():
+    myPC = PolarCode(128, 64)
+    Construct(myPC, 2.0)
+    myPC.set_crc('crc11')
+    messages, llrs = transmit_frames(myPC, 1.5, 3, 60)
+    crc_aided = np.all(decode_frames(myPC, llrs, 'scl', list_size=8) == messages, axis=1)
+    myPC.set_crc(None)  # the same lists, from which the most likely path is always selected
+    most_likely = np.all(decode_frames(myPC, llrs, 'scl', list_size=8)[:, :-11] == messages, axis=1)
+
+    # a correct most likely path passes the CRC, so it is selected, and the CRC finds other correct paths
+    assert np.all(crc_aided[most_likely])
+    assert np.sum(crc_aided) > np.sum(most_likely)
+
+
+def test_systematic_round_trip(code_name):
+    myPC = make_code(code_name)
+    info = myPC.frozen_lookup == 1
+    messages, llrs = transmit_frames(myPC, 2.0, 7, 16, 'systematic_encode')
+    codewords = BatchEncode(myPC, 'systematic_encode').encode(messages)
+
+    # the messages are in the codewords, which are codewords of the polar code
+    np.testing.assert_array_equal(codewords[:, info], messages)
+    assert not np.any(polar_transform(codewords)[:, ~info])
+
+    # without noise every systematic decoder returns the messages, and with noise they agree with each other
+    noiseless = np.where(codewords == 0, 20.0, -20.0)
+    if myPC.punct_flag:
+        noiseless[:, myPC.source_set_lookup == 0] = np.inf
+    for decoder_name in ['systematic_scd', 'systematic_vscd', 'systematic_fast_ssc']:
+        np.testing.assert_array_equal(decode_frames(myPC, noiseless, decoder_name), messages)
+    np.testing.assert_array_equal(decode_frames(myPC, llrs, 'systematic_vscd'), decode_frames(myPC, llrs, 'systematic_scd'))
+
+
+@pytest.mark.parametrize('decoder_name', ['scd', 'vscd', 'fast_ssc'])
+def test_numba_matches_numpy(code_name, decoder_name):
+    pytest.importorskip('numba')
+    myPC = make_code(code_name)
+    llrs = random_llrs(myPC, SEEDS[code_name])
+    np.testing.assert_array_equal(decode_frames(myPC, llrs, decoder_name, backend='numba'),
+                                  decode_frames(myPC, llrs, decoder_name, backend='numpy'))
+
+
+def test_numba_construction_matches_numpy():
+    pytest.importorskip('numba')
+    numpy_PC = PolarCode(256, 128)
+    numba_PC = PolarCode(256, 128)
+    Construct(numpy_PC, 2.0, backend='numpy')
+    Construct(numba_PC, 2.0, backend='numba')
+    np.testing.assert_array_equal(numba_PC.frozen_lookup, numpy_PC.frozen_lookup)
+
+
+class Crash(Exception):
+    pass
+
+
+def test_checkpoint_resume_round_trip(tmp_path, monkeypatch):
+    sim_params = dict(Eb_No_vec=np.arange(1, 4), design_SNR=2.0, manual_const_flag=False, max_iter=600,
+                      min_iterations=600, min_errors=10, batch_size=64, checkpoint_frames=128)
+
+    # an uninterrupted simulation
+    make_code('polar').simulate(save_to=str(tmp_path / 'full'), checkpoint_to=str(tmp_path / 'full_checkpoint.json'),
+                                **sim_params)
+
+    # the same simulation, which crashes just after the first checkpoint of the second SNR is written (each SNR has
+    # five checkpoints of its frames and one when it is completed)
+    save_checkpoint = PolarCode.save_checkpoint
+    num_saved = []
+    def crashing_save_checkpoint(self, filename, checkpoint):
+        save_checkpoint(self, filename, checkpoint)
+        num_saved.append(1)
+        if len(num_saved) == 7:
+            raise Crash()
+    monkeypatch.setattr(PolarCode, 'save_checkpoint', crashing_save_checkpoint)
+    with pytest.raises(Crash):
+        make_code('polar').simulate(save_to=str(tmp_path / 'resumed'), checkpoint_to=str(tmp_path / 'checkpoint.json'),
+                                    **sim_params)
+    monkeypatch.undo()
+    with open(tmp_path / 'checkpoint.json', encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    assert len(checkpoint['completed_counts']) == 1 and checkpoint['partial_counts'] is not None
+
+    PolarCode.resume(str(tmp_path / 'checkpoint.json'))
+    with open(tmp_path / 'full.json', encoding='utf-8') as f:
+        full = json.load(f)
+    with open(tmp_path / 'resumed.json', encoding='utf-8') as f:
+        resumed = json.load(f)
+    assert resumed == full
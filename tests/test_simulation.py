@@ -0,0 +1,96 @@
+"""
+Regression tests for the simulation modes, which must count the same errors as the frame-by-frame simulation, or
+estimate the same error rates.
+Run with ``python -m pytest tests`` from the root of the repository.
+"""
+
+import json
+import warnings
+
+import numpy as np
+import pytest
+
+from polarcodes.AWGN import AWGN
+from polarcodes.BatchEncode import BatchEncode
+from polarcodes.Construct import Construct
+from polarcodes.Decode import Decode
+from polarcodes.Pipeline import Pipeline
+from polarcodes.PolarCode import PolarCode
+from polarcodes.Shorten import Shorten
+from polarcodes.utils import frame_errors
+
+
+def make_code(name):
+    if name == 'polar':
+        myPC = PolarCode(64, 32)
+        Construct(myPC, 2.0)
+    else:
+        myPC = PolarCode(56, 28, ('shorten', 'brs', [], [], False))
+        Shorten(myPC, 2.0)
+    return myPC
+
+
+def frame_by_frame_counts(myPC, Eb_No, max_iter, min_errors, min_iters, batch_size, seed):
+    # the frames of the pipeline, decoded one at a time by the SC decoder and counted as in `PolarCode.run_simulation`
+    rng = np.random.default_rng(seed)
+    encoder = BatchEncode(myPC)
+    channel = AWGN(myPC, Eb_No, manual=True)
+    counts = np.zeros(3, dtype=int)
+    while counts[2] < max_iter:
+        messages = rng.integers(2, size=(min(batch_size, max_iter - counts[2]), myPC.get_message_length()))
+        llrs = channel.get_batch_likelihoods(encoder.encode(messages), rng=rng)
+        for message, likelihoods in zip(messages, llrs):
+            myPC.likelihoods = likelihoods
+            Decode(myPC, 'scd')
+            num_errors = int(np.sum(message != myPC.message_received))
+            counts += [frame_errors(num_errors), num_errors, 1]
+            if counts[0] >= min_errors and counts[2] >= min_iters:
+                return tuple(counts)
+    return tuple(counts)
+
+
+@pytest.mark.parametrize('code_name', ['polar', 'shortened'])
+@pytest.mark.parametrize('min_errors', [np.inf, 25])
+def test_pipeline_matches_run_simulation(code_name, min_errors):
+    myPC = make_code(code_name)
+    expected = frame_by_frame_counts(myPC, 2.0, 300, min_errors, 50, 32, 4)
+    counts = Pipeline(myPC, batch_size=32).run_simulation(2.0, 300, min_errors, 50, np.random.default_rng(4))
+    assert counts == expected
+    if min_errors != np.inf:
+        assert counts[2] < 300 and counts[2] % 32 != 0  # stopped in the middle of a batch
+
+
+@pytest.mark.parametrize('code_name', ['polar', 'shortened'])
+def test_importance_sampling_matches_monte_carlo(code_name):
+    # at a moderate SNR, plain Monte-Carlo has enough frame errors to check the importance sampling estimate against
+    myPC = make_code(code_name)
+    np.random.seed(1)
+    frame_error_count, _, num_frames = myPC.run_batch_simulation(4.0, 200000, np.inf, 0, 8192)
+    fer = frame_error_count / num_frames
+    np.random.seed(2)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')  # too few effective frame errors
+        counts = myPC.run_importance_simulation(4.0, 100000, 400, 1, 4096, 1.0)
+    is_fer, is_fer_variance = counts[3], counts[5]
+    assert abs(is_fer - fer) < 3 * np.sqrt(fer * (1 - fer) / num_frames + is_fer_variance)
+
+
+def test_simulation_modes_keep_their_own_results(tmp_path):
+    # each entry point saves the results of its own mode, and not those of an earlier simulation of the same code
+    myPC = make_code('polar')
+    sim_params = dict(Eb_No_vec=np.arange(1, 3), max_iter=512, batch_size=128)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # too few effective frame errors
+        myPC.simulate_importance(str(tmp_path / 'importance'), min_iterations=512, **sim_params)
+    myPC.simulate_adaptive(str(tmp_path / 'adaptive'), ci_width=0.5, chunk_size=128, **sim_params)
+    myPC.simulate(str(tmp_path / 'plain'), min_iterations=512, **sim_params)
+    mode_fields = {
+        'importance': {'importance_shift', 'FER_variance', 'BER_variance', 'effective_frame_errors'},
+        'adaptive': {'confidence', 'FER_lower', 'FER_upper', 'frames'},
+        'plain': set(),
+    }
+    for name, fields in mode_fields.items():
+        with open(tmp_path / (name + '.json'), encoding='utf-8') as f:
+            data = json.load(f)
+        assert set(data) - {'N', 'n', 'K', 'frozen', 'construction_type', 'punct_flag', 'punct_type', 'punct_set',
+                            'source_set', 'punct_algorithm', 'update_frozen_flag', 'BER', 'FER', 'SNR'} == fields